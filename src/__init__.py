@@ -13,6 +13,7 @@ from .viewboxv2 import ViewBoxV2
 
 # util classes
 from .util.workerthread import WorkerThread, WorkerTaskBase
+from .util.databuffer import DataBuffer
 
 # helper functions
 from .time_plot_main_window import start_application
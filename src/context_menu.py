@@ -8,6 +8,14 @@ from PyQt5.QtWidgets import QInputDialog, QColorDialog, QSpinBox, QGraphicsWidge
 from PyQt5.QtGui import QIcon, QFont, QCursor, QRegion, QPolygon, QWindow, QColor
 from PyQt5 import QtCore, Qt, QtGui
 
+try:
+    from .util.spectrum import WelchSpectrum
+    from .time_axis_item import TIME_RESOLUTIONS
+except:
+    from util.spectrum import WelchSpectrum
+    from time_axis_item import TIME_RESOLUTIONS
+
+
 class TimePlotContextMenu():
     """TimePlotContextMenu class customizes the pyqtgraph context menu
     
@@ -268,6 +276,23 @@ class TimePlotContextMenu():
         self.change_labels_menu.relative_time = relative_time
         self.change_labels_menu.relative_time_checkbox = relative_time_checkbox
 
+        time_resolution = QtGui.QWidgetAction(self.change_labels_menu)
+        time_resolution_widget = QWidget()
+        tr_label = QLabel("Absolute Time Resolution")
+        time_resolution_combobox = QComboBox()
+        time_resolution_combobox.addItems(['auto'] + list(TIME_RESOLUTIONS))
+        time_resolution_combobox.currentTextChanged.connect(
+            self.tpg.set_time_resolution
+        )
+        tr_layout = QHBoxLayout()
+        tr_layout.setContentsMargins(10,0,0,0)
+        tr_layout.addWidget(tr_label)
+        tr_layout.addWidget(time_resolution_combobox)
+        time_resolution_widget.setLayout(tr_layout)
+        time_resolution.setDefaultWidget(time_resolution_widget)
+        self.change_labels_menu.addAction(time_resolution)
+        self.change_labels_menu.time_resolution = time_resolution
+
     def _add_load_past_data(self):
         """add load-past-data function to Plot Option menu
         
@@ -309,6 +334,56 @@ class TimePlotContextMenu():
         self.transform_menu.addAction(local_fourier)
         self.transform_menu.local_fourier = local_fourier
 
+        live_spectrum = QtGui.QWidgetAction(self.transform_menu)
+        live_spectrum_widget = QWidget()
+        ls_label = QLabel("Live Spectrum Mode")
+        live_spectrum_checkbox = QtGui.QCheckBox()
+        live_spectrum_checkbox.stateChanged.connect(
+            self.tpg.set_live_spectrum_mode
+        )
+        segment_len_spinbox = QSpinBox()
+        segment_len_spinbox.setRange(16, 65536)
+        segment_len_spinbox.setValue(WelchSpectrum.SEGMENT_LEN)
+        segment_len_spinbox.setToolTip('number of values per segment')
+        segment_len_spinbox.valueChanged.connect(
+            self.tpg.set_live_spectrum_segment_len
+        )
+        ls_layout = QHBoxLayout()
+        ls_layout.setContentsMargins(10,0,0,0)
+        ls_layout.addWidget(ls_label)
+        ls_layout.addWidget(live_spectrum_checkbox)
+        ls_layout.addWidget(segment_len_spinbox)
+        live_spectrum_widget.setLayout(ls_layout)
+        live_spectrum.setDefaultWidget(live_spectrum_widget)
+        self.transform_menu.addAction(live_spectrum)
+        self.transform_menu.live_spectrum = live_spectrum
+
+        spectrogram = QtGui.QWidgetAction(self.transform_menu)
+        spectrogram_widget = QWidget()
+        sg_label = QLabel("Spectrogram")
+        spectrogram_checkbox = QtGui.QCheckBox()
+        spectrogram_checkbox.stateChanged.connect(self.tpg.show_spectrogram)
+        line_spinbox = QSpinBox()
+        self.spectrogram_line_spinbox = line_spinbox
+        self.update_spectrogram_line_range()
+        line_spinbox.setToolTip('data line shown in spectrogram')
+        line_spinbox.valueChanged.connect(self.tpg.set_spectrogram_line)
+        sg_layout = QHBoxLayout()
+        sg_layout.setContentsMargins(10,0,0,0)
+        sg_layout.addWidget(sg_label)
+        sg_layout.addWidget(spectrogram_checkbox)
+        sg_layout.addWidget(line_spinbox)
+        spectrogram_widget.setLayout(sg_layout)
+        spectrogram.setDefaultWidget(spectrogram_widget)
+        self.transform_menu.addAction(spectrogram)
+        self.transform_menu.spectrogram = spectrogram
+
+    def update_spectrogram_line_range(self):
+        """limits spectrogram line selection to the data lines present or 
+        expected from the connected devices"""
+        n_lines = max(len(self.tpg.data_table), self.tpg.dev_num)
+        self.spectrogram_line_spinbox.setRange(0, max(n_lines - 1, 0))
+
     def remove_options_from_default_contextmenu(self):
         """remove some default options from the contextmenu
         
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SpectrogramPlot shows the live spectrogram of one TimePlotDataItem.
+
+The spectrogram is drawn as a single pg.ImageItem. Its image has a fixed
+size given by the number of columns of the Spectrogram object such that the
+rendering cost does not depend on the length of the data line.
+
+
+"""
+__version__ = "1.0.0"
+
+
+import numpy as np
+import pyqtgraph as pg
+from PyQt5.QtCore import QRectF
+
+
+
+class SpectrogramPlot(pg.PlotWidget):
+    """PlotWidget displaying the spectrogram of a TimePlotDataItem
+
+    Time is shown on the x axis, frequency on the y axis, and the amplitude in
+    dB as color. The image is only replaced when the Spectrogram object of
+    the data item has computed new columns.
+
+
+    Parameter
+    ---------
+    lut : ndarray
+        color lookup table of the image. Defaults to a colormap from dark blue
+        (low amplitude) to yellow (high amplitude).
+
+    """
+
+    COLORMAP_POS = [0., 0.33, 0.66, 1.]
+    COLORMAP_COLORS = [
+        (68, 1, 84, 255), (49, 104, 142, 255), 
+        (53, 183, 121, 255), (253, 231, 37, 255)
+    ]
+
+    def __init__(self, *args, lut=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.data_item = None
+        self.image_item = pg.ImageItem()
+        if lut is None:
+            lut = pg.ColorMap(
+                SpectrogramPlot.COLORMAP_POS, SpectrogramPlot.COLORMAP_COLORS
+            ).getLookupTable()
+        self.image_item.setLookupTable(lut)
+        self.addItem(self.image_item)
+        self.setLabel('bottom', 'Time', units='s')
+        self.setLabel('left', 'Frequency', units='Hz')
+        self._count = None
+
+    def set_data_item(self, data_item):
+        """sets TimePlotDataItem whose spectrogram is shown. None shows no
+        spectrogram."""
+        self.data_item = data_item
+        self._count = None
+        self.image_item.clear()
+        self.update_image()
+
+    def update_image(self):
+        """replaces image if new spectrogram columns are available"""
+        if self.data_item is None or not self.isVisible():
+            return
+        spectrogram = self.data_item.spectrogram
+        spectrogram.update()
+        if spectrogram.n_segments == self._count:
+            return
+        self._count = spectrogram.n_segments
+        data = spectrogram.get_image()
+        if data is None:
+            self.image_item.clear()
+            return
+        image, tmin, tmax, fmax = data
+        self.image_item.setImage(image, autoLevels=True)
+        self.image_item.setRect(QRectF(tmin, 0, tmax - tmin, fmax))
@@ -3,42 +3,171 @@
 """
 TimeAxisItem is used to cutomize time axis of the TimePlotGui object.
 
+Tick labels are formatted for all ticks of a repaint at once with numpy and
+are kept in a LRU cache. While the view pans, most ticks keep their value and
+spacing such that only the labels of new ticks need to be formatted.
 
 
 """
 __version__ = "1.0.0"
 
 
-import datetime
 import time
+from collections import OrderedDict
 
 import numpy as np
 import pyqtgraph as pg
 
 
 
+class TimeAxisItemException(Exception):
+    pass
+
+
+# resolution of absolute time labels: (datetime64 unit, label slice)
+TIME_RESOLUTIONS = OrderedDict([
+    ('ms', ('ms', slice(11, 23))),      # HH:MM:SS.fff
+    ('s', ('s', slice(11, 19))),        # HH:MM:SS
+    ('min', ('m', slice(11, 16))),      # HH:MM
+    ('h', ('m', slice(5, 16))),         # mm-dd HH:MM
+    ('day', ('D', slice(0, 10))),       # YYYY-mm-dd
+])
+# smallest tick spacing (in s) for which the resolution is selected
+AUTO_RESOLUTION_SPACING = [
+    ('day', 86400.), ('h', 3600.), ('min', 60.), ('s', 1.), ('ms', 0.)
+]
+
+
+def get_auto_resolution(spacing):
+    """returns resolution of absolute time labels for tick spacing in s"""
+    for resolution, min_spacing in AUTO_RESOLUTION_SPACING:
+        if spacing >= min_spacing:
+            return resolution
+    return 'ms'
+
+
+def format_absolute_time(values, resolution):
+    """returns local time strings of timestamps
+
+    Parameter
+    ---------
+    values : ndarray
+        timestamps in s since epoch
+    resolution : str
+        one of TIME_RESOLUTIONS
+
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return []
+    unit, label_slice = TIME_RESOLUTIONS[resolution]
+    # local time offset changes at most at DST transitions
+    offsets = [time.localtime(int(v)).tm_gmtoff for v in (values[0], values[-1])]
+    if offsets[0] == offsets[-1]:
+        values = values + offsets[0]
+    else:
+        values = values + [time.localtime(int(v)).tm_gmtoff for v in values]
+    stamps = np.floor(values*1e3).astype(np.int64).astype('datetime64[ms]')
+    strings = np.datetime_as_string(stamps, unit=unit)
+    return [s[label_slice].replace('T', ' ') for s in strings]
+
+
+def format_relative_time(values, scale, spacing):
+    """returns strings of time values in the same format as
+    pg.AxisItem.tickStrings"""
+    vs = np.asarray(values, dtype=np.float64) * scale
+    if len(vs) == 0:
+        return []
+    places = int(max(0, np.ceil(-np.log10(spacing*scale))))
+    strings = np.char.mod('%0.{}f'.format(places), vs).astype(object)
+    use_g = (np.abs(vs) < .001) | (np.abs(vs) >= 10000)
+    if np.any(use_g):
+        strings[use_g] = np.char.mod('%g', vs[use_g])
+    return list(strings)
+
+
 class TimeAxisItem(pg.AxisItem):
-    def __init__(self, t0, relative_time, *args, **kwargs):
+    """AxisItem showing relative time or local time of day
+
+    Parameter
+    ---------
+    t0 : float
+        timestamp corresponding to time value 0
+    relative_time : bool
+        shows time values relative to t0 if True and local time otherwise
+    resolution : str
+        resolution of local time labels. One of TIME_RESOLUTIONS or 'auto'
+        which selects the resolution from the tick spacing.
+
+    """
+
+    TICK_CACHE_SIZE = 1024
+
+    def __init__(self, t0, relative_time, *args, resolution='auto', **kwargs):
         super().__init__(*args, **kwargs)
         self.t0 = t0
         self.relative_time = relative_time
+        self.set_resolution(resolution)
+        self.tick_cache = OrderedDict()
+        self.tick_cache_stats = {'hits': 0, 'misses': 0}
         self.setLabel(text='Time', units=None)
         self.enableAutoSIPrefix(False)
 
+    def set_resolution(self, resolution):
+        """sets resolution of local time labels"""
+        if resolution != 'auto' and resolution not in TIME_RESOLUTIONS:
+            raise TimeAxisItemException(
+                'unknown resolution: {}'.format(resolution)
+            )
+        self.resolution = resolution
+        self.picture = None
+        self.update()
+
+    def set_relative_time(self, relative_time):
+        """switches between relative and local time labels"""
+        self.relative_time = relative_time
+        self.picture = None
+        self.update()
+
+    def _get_label_mode(self, scale, spacing):
+        if self.relative_time:
+            return ('relative', scale)
+        resolution = self.resolution
+        if resolution == 'auto':
+            resolution = get_auto_resolution(spacing*scale)
+        return ('absolute', self.t0, resolution)
+
+    def _format(self, values, scale, spacing, mode):
+        if mode[0] == 'relative':
+            return format_relative_time(values, scale, spacing)
+        return format_absolute_time(np.asarray(values)*scale + mode[1], mode[2])
+
     def tickStrings(self, values, scale, spacing):
+        """returns tick labels. Labels are looked up by (value, spacing, mode)
+        and only missing labels are formatted."""
         if self.logMode:
             return self.logTickStrings(values, scale, spacing)
-
-        places = max(0, np.ceil(-np.log10(spacing*scale)))
+        mode = self._get_label_mode(scale, spacing)
+        cache = self.tick_cache
         strings = []
-        for v in values:
-            vs = v * scale
-            if abs(vs) < .001 or abs(vs) >= 10000:
-                vstr = "%g" % vs
+        missing = []
+        for idx, value in enumerate(values):
+            key = (value, spacing, mode)
+            string = cache.get(key)
+            if string is None:
+                missing.append(idx)
             else:
-                vstr = ("%%0.%df" % places) % vs
-            strings.append(vstr)
-        if self.relative_time:
-            return strings
-        else:
-            return [datetime.datetime.fromtimestamp(int(time.mktime(time.localtime(value + self.t0)))).strftime("%H:%M:%S") for value in values]
+                cache.move_to_end(key)
+            strings.append(string)
+        self.tick_cache_stats['hits'] += len(values) - len(missing)
+        self.tick_cache_stats['misses'] += len(missing)
+        if missing:
+            new_strings = self._format(
+                [values[idx] for idx in missing], scale, spacing, mode
+            )
+            for idx, string in zip(missing, new_strings):
+                strings[idx] = string
+                cache[(values[idx], spacing, mode)] = string
+            while len(cache) > TimeAxisItem.TICK_CACHE_SIZE:
+                cache.popitem(last=False)
+        return strings
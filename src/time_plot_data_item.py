@@ -11,6 +11,7 @@ __version__ = "1.0.0"
 
 from os import path
 import time
+from collections import OrderedDict
 
 import numpy as np
 from PyQt5.QtGui import QColor
@@ -20,8 +21,20 @@ import pyqtgraph as pg
 
 try:
     from .plot_item_settings import PlotItemSettings, JSONFileHandler
+    from .util.databuffer import DataBuffer, get_range_indices
+    from .util.datastore import DataStore
+    from .util.minmaxpyramid import MinMaxPyramid
+    from .util.spectrum import WelchSpectrum, Spectrogram, welch
+    from .util.spectrum import resample_uniform
+    from .util.logtransform import LogTransform, safe_log10
 except:
     from plot_item_settings import PlotItemSettings, JSONFileHandler
+    from util.databuffer import DataBuffer, get_range_indices
+    from util.datastore import DataStore
+    from util.minmaxpyramid import MinMaxPyramid
+    from util.spectrum import WelchSpectrum, Spectrogram, welch
+    from util.spectrum import resample_uniform
+    from util.logtransform import LogTransform, safe_log10
 
 
 
@@ -32,20 +45,44 @@ class TimePlotDataItem(JSONFileHandler):
     extended by providing a single value. Internal functionality will take care
     of generating corresponding time value and appending the the Data object of
     PlotCurveItem.
+    Data are kept in a DataBuffer object which appends values in amortized 
+    O(1) and hands zero-copy views of its arrays to the PlotDataItem. A 
+    MinMaxPyramid object provides reduced data for plotting long data lines
+    and a WelchSpectrum object provides the spectrum for the live spectrum 
+    mode. A Spectrogram object computes the live spectrogram and a 
+    LogTransform object keeps the log values for the log mode.
     Furthermore, this class provides loading and saving capabilities for
-    storing data in json files.
+    storing data in a DataStore recording. Saving is incremental: only values
+    appended since the last save are written to the data files.
 
 
     Parameter
     ---------
     data_fn : str
-        filename of data file
+        folder name of the DataStore recording
     id_nr : int 
         data line identification number 
     absolute_time : float
         absolute time value to sync data line values to other data line objects
     do_autosave : bool
         flag to specify if data are autosaved or not
+    autosave_nr : int
+        number of appended values after which data are autosaved
+    max_samples : int
+        maximum number of values kept in memory. Older values are written to 
+        the data file. None keeps all values.
+    max_timespan : float
+        maximum time span in seconds kept in memory. Older values are written
+        to the data file. None keeps all values.
+    store_dtype : str
+        data type used to store data values in the data file. 'float64' or
+        'float32'.
+    writer : DataWriter
+        background writer used to write data to the data file. If None or not
+        running, data are written directly.
+    wal : WriteAheadLog
+        log in which every value is recorded before it is written to the data 
+        file. Allows to restore values after a crash. None disables logging.
     
 
     TO INCLUDE:
@@ -56,13 +93,33 @@ class TimePlotDataItem(JSONFileHandler):
     DATA_NAME = 'data_{:d}'
 
     def __init__(self, data_fn, id_nr=0, absolute_time=None, do_autosave=True,
-                autosave_nr=30):
+                autosave_nr=30, max_samples=None, max_timespan=None,
+                store_dtype='float64', writer=None, wal=None):
         self.id_nr = id_nr
         self.data_name = self._compose_data_name()
         self.fn = data_fn
         self.do_autosave = do_autosave
         self.autosave_nr = autosave_nr
+        self.store_dtype = store_dtype
+        self.writer = writer
+        self.wal = wal
+        self.buffer = DataBuffer(
+            max_len=max_samples,
+            max_span=max_timespan,
+            evict_callback=self.store_evicted_data
+        )
+        self._n_stored = 0          # number of values present in data file
+        self._rewrite = True        # data file needs to be overwritten
+        self._store_offset = 0      # index of first value in data file
+        self._plot_outdated = False # plot does not show all values
+        self.lod = MinMaxPyramid(self.buffer)
+        self.spectrum = WelchSpectrum(self.buffer)
+        self.spectrogram = Spectrogram(self.buffer)
+        self.log_transform = LogTransform(self.buffer)
         self.pdi = PlotDataItemV2([],[])
+        self.pdi.set_level_of_detail(self.lod)
+        self.pdi.set_log_transform(self.log_transform)
+        self.pdi.set_live_spectrum(self.spectrum)
         if absolute_time == None:
             self.absolute_time = time.time()
         else:
@@ -72,25 +129,132 @@ class TimePlotDataItem(JSONFileHandler):
         return TimePlotDataItem.DATA_NAME.format(self.id_nr)
 
     def reset_absolute_time(self, absolute_time):
+        self.buffer.release_evicted()
         self.absolute_time = absolute_time
+        self._mark_unsaved()
+        self._log_reset(*self.get_data())
+
+    def _mark_unsaved(self):
+        """marks that stored data are outdated and need to be overwritten"""
+        self._n_stored = 0
+        self._store_offset = self.buffer.n_evicted
+        self._rewrite = True
+
+    def _reset_derived_data(self):
+        """resets data structures computed from the buffer values"""
+        self.lod.reset()
+        self.spectrum.reset()
+        self.spectrogram.reset()
+        self.log_transform.reset()
+
+    def _log_reset(self, t, y):
+        """records in write-ahead log that data line is replaced by t and y"""
+        if self.wal is None:
+            return
+        self.wal.append(
+            self.data_name, 0, t, y, self.absolute_time, reset=True
+        )
 
     def get_plot_data_item(self):
         """returns the pg.PlotDataItem"""
         return self.pdi
 
-    def append_value(self, val, time_val):
-        """adds value to pg.PlotDataItem data array"""
-        t, y = self.pdi.getData()
-        t = np.append(t, time_val - self.absolute_time)
-        y = np.append(y, val)
-        self.pdi.setData(t,y)
+    def append_value(self, val, time_val, update=True):
+        """adds value to pg.PlotDataItem data array
+        
+        Parameter
+        ---------
+        val : float
+            data value
+        time_val : float
+            absolute time value
+        update : bool
+            if False, the pg.PlotDataItem is not updated until 
+            ``update_plot()`` is called. Allows to redraw the plot with a 
+            fixed frame rate independent of the sampling rate.
+
+        """
+        self.buffer.append(time_val - self.absolute_time, val)
+        if self.wal is not None:
+            self.wal.append(
+                self.data_name, 
+                self.buffer.n_total - 1 - self._store_offset,
+                [time_val - self.absolute_time], 
+                [val], 
+                self.absolute_time
+            )
+        self._values_appended(1, update)
+
+    def append_block(self, t, y, update=True):
+        """adds block of values to pg.PlotDataItem data arrays
+
+        All values are appended with one vectorized call and are recorded in
+        the write-ahead log as a single record.
+
+        Parameter
+        ---------
+        t : ndarray
+            absolute time values
+        y : ndarray
+            data values
+        update : bool
+            if False, the pg.PlotDataItem is not updated until 
+            ``update_plot()`` is called.
+
+        """
+        t = np.asarray(t, dtype=np.float64) - self.absolute_time
+        if len(t) == 0:
+            return
+        self.buffer.extend(t, y)
+        if self.wal is not None:
+            self.wal.append(
+                self.data_name, 
+                self.buffer.n_total - len(t) - self._store_offset,
+                t, 
+                y, 
+                self.absolute_time
+            )
+        self._values_appended(len(t), update)
+
+    def _values_appended(self, n, update):
+        """updates plot and saves data after n values were appended"""
+        if update:
+            self.pdi.setData(*self.buffer.get_data())
+        self._plot_outdated = not update
         if self.do_autosave:
-            if len(t)%self.autosave_nr == 0:
+            n_total = self.buffer.n_total
+            if n_total//self.autosave_nr != (n_total-n)//self.autosave_nr:
                 self.store_data()
 
+    def update_plot(self):
+        """updates pg.PlotDataItem with values appended since the last 
+        update"""
+        if not self._plot_outdated:
+            return
+        self._plot_outdated = False
+        self.pdi.setData(*self.buffer.get_data())
+
     def get_data(self):
-        """returns the pg.PlotDataItem time and data arrays"""
-        return self.pdi.getData()
+        """returns the time and data arrays
+        
+        Returned arrays are views of the stored raw data. They are not affected
+        by the FFT or log mode of the pg.PlotDataItem.
+        """
+        return self.buffer.get_data()
+    
+    def get_data_range(self, tmin=None, tmax=None):
+        """returns time and data arrays of values with tmin <= t <= tmax
+
+        The range is found by binary search on the time array. Returned arrays 
+        are views of the stored raw data, i.e. no data are copied.
+
+        Parameter
+        ---------
+        tmin, tmax : float
+            range boundaries relative to absolute_time. None means unbounded.
+
+        """
+        return self.buffer.get_range(tmin, tmax)
     
     def get_time_data(self):
         """returns the pg.PlotDataItem time value array"""
@@ -100,12 +264,21 @@ class TimePlotDataItem(JSONFileHandler):
         """returns the pg.PlotDataItem data value array"""
         return self.get_data()[1]
 
-    def set_data(self, *args, **kwargs):
+    def set_data(self, t, y):
         """replaces data with provided data"""
-        self.pdi.setData(*args, **kwargs)
+        self.buffer.clear()
+        self._reset_derived_data()
+        self._mark_unsaved()
+        self._log_reset(t, y)
+        self.buffer.extend(t, y)
+        self.pdi.setData(*self.buffer.get_data())
 
     def clear_data(self):
         """clears all data present in this data object"""
+        self.buffer.clear()
+        self._reset_derived_data()
+        self._mark_unsaved()
+        self._log_reset([], [])
         self.pdi.setData([],[])
 
     def start_local_ft_mode(self):
@@ -114,53 +287,166 @@ class TimePlotDataItem(JSONFileHandler):
     def stop_local_ft_mode(self):
         self.pdi.stop_local_ft_mode()
 
+    def set_live_spectrum_mode(self, live):
+        self.pdi.set_live_spectrum_mode(live)
+
+    def set_live_spectrum_params(self, **kwargs):
+        """changes parameters of the live spectrum. See 
+        WelchSpectrum.set_params()"""
+        self.spectrum.set_params(**kwargs)
+        self.pdi.xDisp = self.pdi.yDisp = None
+        self.pdi.updateItems()
+
     def store_data(self, fn=None):
-        """saves data as nested dictionary in json file"""
+        """saves data in DataStore recording
+        
+        Only values which were appended since the last call are written to the
+        data file. If the data were replaced (e.g. by ``set_data()`` or 
+        ``clear_data()``) the stored data line is overwritten.
+
+        Parameter
+        ---------
+        fn : str
+            recording folder. If a folder other than the data_fn given at 
+            initialization is provided, the data values currently in memory 
+            are written to it.
 
-        if fn is None:
-            fn = self.fn
-        # extract data from PlotDataItem object
+        """
+        if fn is not None and fn != self.fn:
+            t, y = self.get_data()
+            self._write(fn, t, y, replace=True)
+            return
+
+        # values evicted from the in-memory window are written first
+        self.buffer.release_evicted()
         t, y = self.get_data()
-        t = t.tolist(); y = y.tolist()
-        data_dct = {
-            't': t,
-            'y': y,
-            'absolute_time': self.absolute_time
-        }
-
-        # load all data, update and overwrite existing file to avoid
-        #   json-format corruption.
-        if path.exists(fn):
-            all_data_dct = self.load(fn)
-        else:
-            all_data_dct = {}
+        self._store_values(t, y, self.buffer.n_evicted)
 
-        all_data_dct.update({self.data_name:data_dct})
-        self.save(fn, all_data_dct, mode='w')
-        return
+    def store_evicted_data(self, t, y):
+        """writes values evicted from the in-memory window to data file
+        
+        This function is used as evict_callback of the DataBuffer object and
+        ensures that values are not lost when the in-memory window is 
+        restricted.
+
+        Parameter
+        ---------
+        t : ndarray
+            time values relative to absolute_time
+        y : ndarray
+            data values
+        """
+        self._store_values(t, y, self.buffer.n_evicted - len(t))
+
+    def _store_values(self, t, y, idx0):
+        """writes values which are not stored yet to data file
+
+        Parameter
+        ---------
+        t, y : ndarray
+            time and data values
+        idx0 : int
+            index of first given value counted from the last data reset
+
+        """
+        n_skip = max(0, self._n_stored - idx0)
+        if n_skip >= len(t) and not self._rewrite:
+            return
+        self._write(self.fn, t[n_skip:], y[n_skip:], replace=self._rewrite)
+        self._n_stored = idx0 + len(t)
+        self._rewrite = False
+
+    def _write(self, fn, t, y, replace=False):
+        """hands values to the background writer or writes them directly to 
+        the data file if no writer is running
+
+        Parameter
+        ---------
+        fn : str
+            recording folder
+        t, y : ndarray
+            time and data values
+        replace : bool
+            if True, the stored data line is replaced. Otherwise values are
+            appended.
+
+        """
+        if self.writer is not None and self.writer.is_alive():
+            store = self.writer
+            args = (fn, self.data_name, t, y, self.absolute_time)
+        else:
+            store = DataStore(fn)
+            args = (self.data_name, t, y, self.absolute_time)
+        if replace:
+            store.write(*args, dtype=self.store_dtype)
+        else:
+            store.append(*args, dtype=self.store_dtype)
 
     def recall_data(self, fn):
         """checks for data in data file and updates pq.PlotDataItem object if
         present
-        
+
         Parameter
         ---------
         fn : str
-            data filename from which data are imported.
+            recording folder, or data file in JSON format from which data are
+            imported.
         """
-        if path.exists(fn):
-            all_data_dct = self.load(fn)
-        else:
-            all_data_dct = {}
-
-        if self.data_name in all_data_dct.keys():
-            data_dct = all_data_dct[self.data_name]
-            t = data_dct['t']
-            y = data_dct['y']
-            self.absolute_time = data_dct['absolute_time']
-            self.set_data(t,y)
+        if not path.exists(fn):
+            return
+        self.recall_from_store(DataStore.open(fn))
+
+    def recall_from_store(self, store):
+        """updates pq.PlotDataItem object with data from DataStore object if 
+        present
+
+        Data are memory-mapped from the recording. Values are therefore read 
+        from disk only when they are accessed (e.g. when they are plotted) and
+        are copied into memory only when new values are appended. If the 
+        recording is not the data file, the data line is copied from it into
+        the data file in the background (see ``_copy_to_store()``).
+        
+        Parameter
+        ---------
+        store : DataStore
+            recording from which data are imported. Allows to load several 
+            data items from a recording which is opened only once.
+        """
+        data = store.load(self.data_name)
+        if data is None:
+            return
+        t, y, absolute_time = data
+        self.buffer.clear()
+        self._reset_derived_data()
+        self.absolute_time = absolute_time
+        if path.abspath(store.folder) != path.abspath(self.fn):
+            self._copy_to_store(store.folder, len(t))
+        # data are present in data file (or will be copied there) and must 
+        #   not be written again
+        self._n_stored = len(t)
+        self._store_offset = 0
+        self._rewrite = False
+        self.buffer.set_data(t, y, copy=False)
+        self.pdi.setData(*self.buffer.get_data())
         return
 
+    def _copy_to_store(self, source_folder, n):
+        """replaces data line in data file by the first n values of the data
+        line in the recording source_folder
+
+        Values are not written to the write-ahead log since they are on disk
+        already. The log references the source recording instead. The column
+        files are copied by the background writer.
+        """
+        if self.wal is not None:
+            self.wal.append_copy(
+                self.data_name, source_folder, n, self.absolute_time
+            )
+        if self.writer is not None and self.writer.is_alive():
+            self.writer.copy(self.fn, source_folder, self.data_name, n)
+        else:
+            DataStore(self.fn).copy(DataStore(source_folder), self.data_name, n)
+
     def set_alpha(self, value):
         """set alpha value in PlotDatItem
         
@@ -268,22 +554,318 @@ class PlotDataItemV2(pg.PlotDataItem):
     pyqtgraph plot objects (e.g. ViewBox, PlotItem, PlotWidget)
 
     This class overwrites:
-        * getData() to introduce local fft mode
-
+        * setData() to count data versions
+        * getData() to introduce local fft mode and level-of-detail plotting
+        * viewRangeChanged() to update level-of-detail data on zooming
+        * dataBounds() to get autorange bounds from the level-of-detail data
+        * _fourierTransform() to apply a window function
+
+    If a MinMaxPyramid is provided with ``set_level_of_detail()``, long data 
+    lines are plotted as min/max pairs of the pyramid level matching the
+    pixel width of the view instead of all values. The cost of building the
+    curve path on a repaint is therefore independent of the length of the 
+    data line.
+
+    Before the Fourier transform, data are resampled on a uniform time grid
+    (see ``util.spectrum.resample_uniform``) as selected by the fftResample
+    option. Resampled data are cached for the current data version and local
+    FT boundaries. Fourier transforms are cached with the data version, the
+    local FT boundaries, and the window function as key. Display updates which do not
+    change the data (e.g. resizing, zooming, or changing the log mode) 
+    therefore do not recompute the Fourier transform.
+
+    In live spectrum mode, FFT mode shows the spectrum of a WelchSpectrum 
+    object (see ``set_live_spectrum()``) instead of the transform of the 
+    whole data line. Combined with local FT mode, the Welch spectrum of the
+    values within the local FT boundaries is shown. WelchSpectrum resamples
+    segments with non-uniform time values itself.
+
+    In log mode, the log values of the data line are taken from a 
+    LogTransform object (see ``set_log_transform()``) which extends them 
+    incrementally when values are appended. Values <= 0 are shown as gaps. 
+    Changing the log mode therefore only switches between the linear and the
+    log arrays.
 
     """
+
+    FFT_CACHE_SIZE = 4
+    FFT_WINDOWS = (None, 'hanning', 'hamming', 'blackman', 'bartlett')
+
     def __init__(self, *args, **kwargs):
+        self.lod = None
+        self._lod_cut = False           # displayed data are cut to view range
+        self._range_log_x = None        # log x mode of stale view range
+        self.spectrum = None
+        self.log_transform = None
+        self._linear_connect = None
+        self.data_version = 0
+        self.fft_cache = OrderedDict()
+        self.fft_cache_size = PlotDataItemV2.FFT_CACHE_SIZE
+        self.fft_cache_stats = {'hits': 0, 'misses': 0}
+        self._resample_cache = (None, None, None)
         super().__init__(*args, **kwargs)
 
         self.opts.update({
-            'fftLocal':     False
+            'fftLocal':     False,
+            'fftWindow':    None,
+            'fftResample':  'auto',
+            'fftLive':      False,
+            'lodMode':      True
         })
 
+    def set_live_spectrum(self, spectrum):
+        """sets WelchSpectrum used in live spectrum mode. The spectrum needs
+        to be computed from the data passed to setData()."""
+        self.spectrum = spectrum
+        self.xDisp = self.yDisp = None
+
+    def set_live_spectrum_mode(self, live):
+        if self.opts['fftLive'] == live:
+            return
+        self.opts['fftLive'] = live
+        self.xDisp = self.yDisp = None
+        self.updateItems()
+
+    def _live_spectrum_enabled(self):
+        return self.spectrum is not None and self.opts['fftLive']
+
+    def setData(self, *args, **kwargs):
+        self.data_version += 1
+        super().setData(*args, **kwargs)
+
+    def set_fft_window(self, window):
+        """sets window function applied before the Fourier transform
+
+        Parameter
+        ---------
+        window : str
+            one of FFT_WINDOWS. None applies no window function.
+
+        """
+        if window not in PlotDataItemV2.FFT_WINDOWS:
+            raise ValueError('unknown FFT window: {}'.format(window))
+        if self.opts['fftWindow'] == window:
+            return
+        self.opts['fftWindow'] = window
+        self.xDisp = self.yDisp = None
+        self.updateItems()
+
+    def get_fft_cache_hit_rate(self):
+        """returns fraction of Fourier transforms taken from the cache"""
+        n = self.fft_cache_stats['hits'] + self.fft_cache_stats['misses']
+        if n == 0:
+            return 0.
+        return self.fft_cache_stats['hits'] / n
+
+    def _get_fft_cache_key(self):
+        bounds = None
+        if self.opts['fftLocal']:
+            bounds = (self._local_ft_xmin, self._local_ft_xmax)
+        welch_params = None
+        if self._live_spectrum_enabled():
+            welch_params = (
+                self.spectrum.segment_len, self.spectrum.overlap, 
+                self.spectrum.window
+            )
+        return (self.data_version, bounds, self.opts['fftWindow'], 
+                welch_params)
+
+    def _get_fourier_transform(self, x, y):
+        """returns Fourier transform of data from cache or computes it"""
+        if self._live_spectrum_enabled() and not self.opts['fftLocal']:
+            # updated incrementally and therefore not cached
+            return self.spectrum.get_spectrum()
+        if self.opts['fftLocal']:
+            if not hasattr(self, '_local_ft_xmin'):
+                self.start_local_ft_mode()
+        key = self._get_fft_cache_key()
+        if key in self.fft_cache:
+            self.fft_cache.move_to_end(key)
+            self.fft_cache_stats['hits'] += 1
+            return self.fft_cache[key]
+
+        self.fft_cache_stats['misses'] += 1
+        x, y = self._get_resampled_data(x, y)
+        if self._live_spectrum_enabled():
+            x, y = welch(
+                x, y, self.spectrum.segment_len, self.spectrum.overlap, 
+                self.spectrum.window
+            )
+        else:
+            x, y = self._fourierTransform(x, y)
+        if self.fft_cache_size > 0:
+            self.fft_cache[key] = (x, y)
+            while len(self.fft_cache) > self.fft_cache_size:
+                self.fft_cache.popitem(last=False)
+        return x, y
+
+    def set_fft_resample_method(self, method):
+        """sets method used to resample data before the Fourier transform. 
+        See ``util.spectrum.resample_uniform``."""
+        if self.opts['fftResample'] == method:
+            return
+        self.opts['fftResample'] = method
+        self.fft_cache.clear()
+        self._resample_cache = (None, None, None)
+        self.xDisp = self.yDisp = None
+        self.updateItems()
+
+    def _get_resampled_data(self, x, y):
+        """returns data within local FT boundaries resampled on a uniform 
+        grid. Result is cached for the current data version."""
+        key = self._get_fft_cache_key()[:2]
+        if self._resample_cache[0] == key:
+            return self._resample_cache[1:]
+        if self.opts['fftLocal']:
+            x, y = self._get_data_in_local_ft_boundaries(x, y)
+        x, y = resample_uniform(x, y, method=self.opts['fftResample'])
+        self._resample_cache = (key, x, y)
+        return x, y
+
+    def _fourierTransform(self, x, y):
+        ## Perform Fourier transform. x values need to be sampled uniformly,
+        ## i.e. data are resampled by _get_resampled_data() before.
+        n = y.size
+        if self.opts['fftWindow'] is None:
+            f = np.fft.rfft(y) / n
+        else:
+            window = getattr(np, self.opts['fftWindow'])(n)
+            f = np.fft.rfft(y*window) / window.sum()
+        d = float(x[-1]-x[0]) / (len(x)-1)
+        x = np.fft.rfftfreq(n, d)
+        y = np.abs(f)
+        return x, y
+
+    def set_level_of_detail(self, lod):
+        """sets MinMaxPyramid used to reduce plotted data. The pyramid needs
+        to summarize the data passed to setData()."""
+        self.lod = lod
+        self.xDisp = self.yDisp = None
+
+    def _lod_enabled(self):
+        return (
+            self.lod is not None and self.opts['lodMode'] 
+            and not self.opts['fftMode']
+        )
+
+    def _get_view_box(self):
+        """returns ViewBox showing this item or None"""
+        view = self.getViewBox()
+        if not isinstance(view, pg.ViewBox):
+            return None
+        return view
+
+    def _get_view_width(self):
+        """returns width of view in pixels or None if not shown"""
+        view = self._get_view_box()
+        if view is None or view.width() == 0:
+            return None
+        return int(view.width())
+
+    def _get_lod_data(self):
+        """returns data reduced to pixel width of visible range"""
+        tmin = tmax = None
+        view = self._get_view_box()
+        if view is not None and not view.autoRangeEnabled()[0]:
+            # view range is used since viewRect() may not be updated yet
+            tmin, tmax = self._get_time_range(view.viewRange()[0])
+        width = self._get_view_width()
+        self._lod_cut = self.lod.is_reduced(width)
+        return self.lod.get_data(tmin, tmax, width)
+
+    def _get_time_range(self, view_range):
+        """returns time range of given x range of the view
+
+        Right after the log x mode changed (see ``setLogMode()``), the view
+        range is still given in the coordinates of the previous mode. In this
+        case (None, None) is returned such that the data are not cut.
+        """
+        if self._range_log_x is not None:
+            return None, None
+        tmin, tmax = view_range
+        if self.opts['logMode'][0]:
+            with np.errstate(over='ignore'):
+                tmin, tmax = np.power(10., [tmin, tmax])
+        return tmin, tmax
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        """returns range of data along axis ax
+
+        With level-of-detail data, bounds are taken from the running bounds
+        or the pyramid blocks of the MinMaxPyramid (see 
+        ``MinMaxPyramid.get_bounds()``) instead of scanning the plotted data. 
+        The cost per call is therefore independent of the number of values.
+        Other cases are handled by pg.PlotDataItem.dataBounds().
+        """
+        if not self._lod_enabled() or frac != 1.0 or self.xData is None \
+                or not self.curve.isVisible():
+            return super().dataBounds(ax, frac=frac, orthoRange=orthoRange)
+        if ax == 0:
+            if orthoRange is not None:
+                return super().dataBounds(ax, frac, orthoRange)
+            t = self.xData
+            bounds = (t[0], t[-1])
+        else:
+            tmin = tmax = None
+            if orthoRange is not None:
+                tmin, tmax = self._get_time_range(orthoRange)
+            bounds = self.lod.get_bounds(tmin, tmax)
+            if bounds is None:
+                return [None, None]
+        if self.opts['logMode'][ax]:
+            if bounds[0] <= 0:
+                return super().dataBounds(ax, frac, orthoRange)
+            bounds = np.log10(bounds)
+        return [bounds[0], bounds[1]]
+
+    def viewRangeChanged(self, *args, **kwargs):
+        self._range_log_x = None
+        # level-of-detail data of long data lines are cut to the view range 
+        #   and need to be fetched again
+        if self._lod_enabled() and self.xData is not None and (
+                self._lod_cut or self.lod.is_reduced(self._get_view_width())):
+            self.xDisp = self.yDisp = None
+            self.updateItems()
+        super().viewRangeChanged(*args, **kwargs)
+
+    def set_log_transform(self, log_transform):
+        """sets LogTransform used in log mode. The transform needs to be
+        computed from the data passed to setData()."""
+        self.log_transform = log_transform
+        self.xDisp = self.yDisp = None
+
+    def _get_log_data(self, x, y, raw):
+        """returns x and y with log10 applied as selected by the log mode.
+        Values <= 0 are replaced by NaN. If raw is True, x and y are the data 
+        passed to setData() and log values are taken from the LogTransform."""
+        log_x = log_y = None
+        if raw and self.log_transform is not None:
+            log_x, log_y = self.log_transform.get_data()
+            if len(log_x) != len(x):
+                log_x = log_y = None
+        if self.opts['logMode'][0]:
+            x = safe_log10(x) if log_x is None else log_x
+        if self.opts['logMode'][1]:
+            y = safe_log10(y) if log_y is None else log_y
+        return x, y
+
     def setLogMode(self, xMode, yMode):
-        print('setting log mode')
         if self.opts['logMode'] == [xMode, yMode]:
             return
+        if xMode != self.opts['logMode'][0] and self._range_log_x is None:
+            # view range is switched after all items changed the log mode
+            self._range_log_x = self.opts['logMode'][0]
+        elif xMode == self._range_log_x:
+            self._range_log_x = None
         self.opts['logMode'] = [xMode, yMode]
+        # values <= 0 are NaN in log mode and are shown as gaps
+        if xMode or yMode:
+            if self._linear_connect is None:
+                self._linear_connect = self.opts['connect']
+            self.opts['connect'] = 'finite'
+        elif self._linear_connect is not None:
+            self.opts['connect'] = self._linear_connect
+            self._linear_connect = None
         self.xDisp = self.yDisp = None
         self.xClean = self.yClean = None
         self.updateItems()
@@ -297,48 +879,54 @@ class PlotDataItemV2(pg.PlotDataItem):
             x = self.xData
             y = self.yData
 
+            lod = self._lod_enabled()
+            if lod:
+                x, y = self._get_lod_data()
+
             if self.opts['fftMode']:
-                if self.opts['fftLocal']:
-                    x,y = self._get_data_in_local_ft_boundaries(x,y)
-                x,y = self._fourierTransform(x, y)
+                x,y = self._get_fourier_transform(x, y)
                 # Ignore the first bin for fft data if we have a logx scale
                 if self.opts['logMode'][0]:
                     x=x[1:]
                     y=y[1:]
 
-            if self.opts['logMode'][0]:
-                x = np.log10(x)
-            if self.opts['logMode'][1]:
-                y = np.log10(y)
+            # linear x is kept for clipping since log x starts with NaN for 
+            #   values <= 0
+            x_linear = x
+            if any(self.opts['logMode']):
+                # level-of-detail data are not reduced for short data lines
+                raw = not self.opts['fftMode'] and len(x) == len(self.xData) \
+                    and np.may_share_memory(x, self.xData)
+                x, y = self._get_log_data(x, y, raw=raw)
 
             ds = self.opts['downsample']
             if not isinstance(ds, int):
                 ds = 1
 
-            if self.opts['autoDownsample']:
-                # this option presumes that x-values have uniform spacing
-                range = self.viewRect()
-                if range is not None:
-                    dx = float(x[-1]-x[0]) / (len(x)-1)
-                    x0 = (range.left()-x[0]) / dx
-                    x1 = (range.right()-x[0]) / dx
-                    width = self.getViewBox().width()
+            # visible values are found by binary search on x which is 
+            #   increasing in every mode. No uniform spacing is presumed.
+            view = self._get_view_box()
+            if (self.opts['autoDownsample'] or self.opts['clipToView']) \
+                    and not lod and view is not None and len(x) > 1:
+                xmin, xmax = view.viewRange()[0]
+                if self.opts['logMode'][0]:
+                    xmin, xmax = 10**xmin, 10**xmax
+                x0, x1 = get_range_indices(x_linear, xmin, xmax)
+
+                if self.opts['autoDownsample']:
+                    width = view.width()
                     if width != 0.0:
-                        ds = int(max(1, int((x1-x0) / (width*self.opts['autoDownsampleFactor']))))
+                        ds = int(max(1, int(
+                            (x1-x0) / (width*self.opts['autoDownsampleFactor'])
+                        )))
                     ## downsampling is expensive; delay until after clipping.
 
-            if self.opts['clipToView']:
-                view = self.getViewBox()
-                if view is None or not view.autoRangeEnabled()[0]:
-                    # this option presumes that x-values have uniform spacing
-                    range = self.viewRect()
-                    if range is not None and len(x) > 1:
-                        dx = float(x[-1]-x[0]) / (len(x)-1)
-                        # clip to visible region extended by downsampling value
-                        x0 = np.clip(int((range.left()-x[0])/dx)-1*ds , 0, len(x)-1)
-                        x1 = np.clip(int((range.right()-x[0])/dx)+2*ds , 0, len(x)-1)
-                        x = x[x0:x1]
-                        y = y[x0:x1]
+                if self.opts['clipToView'] and not view.autoRangeEnabled()[0]:
+                    # clip to visible region extended by downsampling value
+                    x0 = max(0, x0 - 1*ds)
+                    x1 = min(len(x), x1 + 2*ds)
+                    x = x[x0:x1]
+                    y = y[x0:x1]
 
             if ds > 1:
                 if self.opts['downsampleMethod'] == 'subsample':
@@ -372,9 +960,8 @@ class PlotDataItemV2(pg.PlotDataItem):
         xmin, xmax = self._local_ft_xmin, self._local_ft_xmax
 
         # truncate x and y
-        idx_lst = (xmin<x) & (x<xmax)
-        x_, y_ = x[idx_lst], y[idx_lst]
-        return x_,y_
+        start, stop = get_range_indices(x, xmin, xmax)
+        return x[start:stop], y[start:stop]
 
     def _get_viewbox_boundaries(self):
         vb = self.getViewBox()
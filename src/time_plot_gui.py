@@ -24,7 +24,6 @@ import ctypes as ct
 import numpy as np
 import time
 import datetime
-from functools import wraps
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, QMutex, QWaitCondition, QSize, QPoint
 from unittest.mock import MagicMock
 
@@ -46,9 +45,12 @@ try:
 
     from .util.workerthread import WorkerThread,WorkerTaskBase
     from .util.devicewrapper import DeviceWrapper, DummyDevice
+    from .util.datastore import DataStore, DataWriter, WriteAheadLog
+    from .util.samplequeue import SampleQueue
     from .viewboxv2 import ViewBoxV2
     from .time_plot_data_item import TimePlotDataItem
     from .time_axis_item import TimeAxisItem
+    from .spectrogram_plot import SpectrogramPlot
     from .context_menu import TimePlotContextMenu
 except:
     from time_plot_worker import TimePlotWorker
@@ -56,9 +58,12 @@ except:
 
     from util.workerthread import WorkerThread,WorkerTaskBase
     from util.devicewrapper import DeviceWrapper, DummyDevice
+    from util.datastore import DataStore, DataWriter, WriteAheadLog
+    from util.samplequeue import SampleQueue
     from viewboxv2 import ViewBoxV2
     from time_plot_data_item import TimePlotDataItem
     from time_axis_item import TimeAxisItem
+    from spectrogram_plot import SpectrogramPlot
     from context_menu import TimePlotContextMenu
 
 
@@ -89,76 +94,77 @@ class TimePlotGui(QWidget):
     folder_filename : str
         directory where  plot settings and plot data will be stored
     sampling_latency : float
-        time delay between two sample acquistion
+        time between two sample acquistions. Samples are acquired 
+        periodically by the device threads. None acquires samples as fast as
+        the devices provide them.
+    max_samples : int
+        maximum number of samples per line kept in memory. Older samples are 
+        moved to disk. None keeps all samples in memory.
+    max_timespan : float
+        maximum time span in seconds per line kept in memory. Older samples 
+        are moved to disk. None keeps all samples in memory.
+    store_dtype : str
+        data type used to store sample values on disk. 'float64' or 'float32'
+    frame_rate : float
+        number of plot updates per second. Incoming samples are collected and
+        all changed lines are redrawn together on every frame.
+    queue_size : int
+        number of samples a device thread can queue before the gui takes 
+        them over. Device threads do not wait for the gui otherwise.
+    overflow : str
+        handling of samples arriving while the queue is full: 'block' 
+        pauses acquisition, 'drop_oldest' discards the oldest queued samples,
+        and 'spill' moves samples to a temporary file on disk.
+    block_size : int
+        minimum number of queued samples per device which are taken over by
+        the gui as one block. None takes over the samples on every frame.
+    block_interval : float
+        maximum time in seconds between two takeovers of the queued samples
+        of a device if block_size is not reached.
+    profile_startup : bool
+        debug option. If True, the time needed to load the data file and 
+        every data line is printed on startup.
     
     
     """
     
-    DEFAULT_DATA_FILENAME = 'stored_data.json'
+    DEFAULT_DATA_FILENAME = 'stored_data'
+    LEGACY_DATA_FILENAME = 'stored_data.json'
+    WAL_CHECKPOINT_SIZE = 2**20      # log size in bytes which triggers saving
 
     start_signal = QtCore.pyqtSignal()
     stop_signal = QtCore.pyqtSignal()
     pause_signal = QtCore.pyqtSignal()
     restart_signal = QtCore.pyqtSignal()
-
-    # =======================================================================
-    # decorator
-    # =======================================================================
-
-    def disable_fft_and_log_mode(func):
-        """function wrapper to temporarily disable FFT and log mode.
-        
-        This function can be used to wrap function which require FFT and log 
-        mode to be temporarily disabled. Examples of this are 
-        ``save_all_data()`` and ``update_datapoint()``.
-        
-        
-        Return
-        ------
-        func
-            function wrapper which disables FFT and log mode while given 
-            function is executed. restores previous FFT and log mode again
-            before finish.
-        
-        """
-        @wraps(func)
-        def wrapper(tpg, *args, **kwargs):
-            # print("inhere")
-            # print('args: ', args)
-            # print('args: ', kwargs)
-            
-            # save current state
-            frequency_state = tpg.frequency_state
-            x_log_check = tpg.context_menu.x_log_check.isChecked()
-            y_log_check = tpg.context_menu.y_log_check.isChecked()
-
-            # disable FFT, x log, and y log state
-            tpg.graphItem.ctrl.fftCheck.setChecked(False)
-            tpg.context_menu.x_log_check.setChecked(False)
-            tpg.context_menu.y_log_check.setChecked(False)
-            
-            # execute function
-            rtrn = func(tpg, *args, **kwargs)
-            
-            # reinstate FFT, x log, and y log state
-            tpg.graphItem.ctrl.fftCheck.setChecked(frequency_state)
-            tpg.context_menu.x_log_check.setChecked(x_log_check)
-            tpg.context_menu.y_log_check.setChecked(y_log_check)
-            # print("still inhere")
-            return rtrn
-        return wrapper
+    wal_checkpoint_signal = QtCore.pyqtSignal(bool)
 
     # =======================================================================
     # 
     # =======================================================================
 
     def __init__(self, parent=None, window=None, devices=None, 
-                 folder_filename = None, sampling_latency = .005):
+                 folder_filename = None, sampling_latency = .005,
+                 max_samples = None, max_timespan = None,
+                 store_dtype = 'float64', frame_rate = 30,
+                 queue_size = None, overflow = 'block',
+                 block_size = None, block_interval = None,
+                 profile_startup = False):
         super(TimePlotGui, self).__init__(parent=parent)
         self._create_absolute_time_stamp()
         self.dev_lst = self._check_devices_type(devices)
         self.dev_num = len(self.dev_lst)
         self.sampling_latency = sampling_latency
+        self.max_samples = max_samples
+        self.max_timespan = max_timespan
+        self.store_dtype = store_dtype
+        self.frame_rate = frame_rate
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.block_size = block_size
+        self.block_interval = block_interval
+        self.profile_startup = profile_startup
+        self.live_spectrum_mode = False
+        self.live_spectrum_params = {}  # set in live spectrum menu
         
         # ===============================
         # Allow for coercion of data and settings to the same number of lines
@@ -171,7 +177,9 @@ class TimePlotGui(QWidget):
         # setup gui and worker thread
         # ===============================
         self._init_settings(folder_filename)
+        self._init_data_writer()
         self._init_ui(window, self.dev_lst)
+        self._init_render_timer()
         self._init_multi_worker_thread(self.dev_lst)
 
 
@@ -236,6 +244,7 @@ class TimePlotGui(QWidget):
         # Initialize the plot
         # =====================================================================
         self._init_plot(dev_lst)
+        self._init_spectrogram_plot()
         # =====================================================================
         # Add Widgets to layout, including the Plot itself. Note that the order
         # in which these are added matters because several widgets overlap.
@@ -243,6 +252,7 @@ class TimePlotGui(QWidget):
         self.graphics_layout.addWidget(self.blankWidget, 0, 2)
         self.graphics_layout.addWidget(self.blankWidget2, 0, 1)
         self.graphics_layout.addWidget(self.graphWidget, 0, 0, 5, 4)
+        self.graphics_layout.addWidget(self.spectrogram_plot, 0, 4, 5, 2)
         self.graphics_layout.addWidget(self.stopBtn, 0, 0)
         self.graphics_layout.addWidget(self.playBtn, 0, 0)
 
@@ -319,10 +329,20 @@ class TimePlotGui(QWidget):
         self.set_custom_settings()
 
 
+    def _init_spectrogram_plot(self):
+        """initializes the spectrogram plot. It is hidden until it is enabled
+        in the context menu."""
+        self.spectrogram_plot = SpectrogramPlot()
+        self.spectrogram_plot.hide()
+        self.spectrogram_id_nr = 0
+
     def _init_data_table(self, dev_lst, new_data = None):
         """initialize data table by populating it with data items
         
-        data items are initialized from scratch or loaded from file
+        data items are initialized from scratch or loaded from file. The data
+        file is opened once and all data items are filled from it. The load 
+        time of every data line is stored in the ``startup_profile`` 
+        dictionary and printed if profile_startup is set.
         
         Parameter
         ---------
@@ -333,26 +353,55 @@ class TimePlotGui(QWidget):
             
         """
         self.data_table = {}
+        self.startup_profile = {}
+
+        if new_data is None:
+            data_fn = self.data_fn
+        else:
+            data_fn = new_data
+        t_start = time.perf_counter()
+        if path.exists(data_fn):
+            store = DataStore.open(data_fn)
+        else:
+            store = None
+        self.startup_profile['open'] = time.perf_counter() - t_start
         
         id_nr = 0
         while True:
+            t_start = time.perf_counter()
             data_item = self._create_data_item(id_nr)
-            if new_data is None:
-                data_item.recall_data(self.data_fn)
-            else:
-                data_item.recall_data(new_data)
+            if store is not None:
+                data_item.recall_from_store(store)
 
             if len(data_item.get_time_data()) == 0:
                 break
 
             self._add_data_item(id_nr, data_item)
+            self.startup_profile[id_nr] = time.perf_counter() - t_start
             id_nr += 1
+        self._data_table_changed()
+        if self.profile_startup:
+            self.print_startup_profile()
+
+    def print_startup_profile(self):
+        """prints the time needed to load the data file and every data line"""
+        print('data file opened in {:.1f} ms'.format(
+            1e3*self.startup_profile['open']
+        ))
+        for id_nr, dt in self.startup_profile.items():
+            if id_nr == 'open':
+                continue
+            print('line {} loaded in {:.1f} ms ({:d} samples)'.format(
+                id_nr, 1e3*dt, len(self.data_table[id_nr].get_time_data())
+            ))
             
     def _init_settings(self, folder_filename):
         """initialize plot settings
         
         Settings are initialized by loading from file or from default values. 
         To initialize the plot settings a PlotItemSettings object is created.
+        Data stored in the previous JSON format are converted to a DataStore 
+        recording if no recording is present yet.
         
         Parameters
         ----------
@@ -370,9 +419,55 @@ class TimePlotGui(QWidget):
             self.plot_item_settings.folder_filename, 
             self.DEFAULT_DATA_FILENAME
         )
+        legacy_data_fn = os.path.join(
+            self.plot_item_settings.folder_filename, 
+            self.LEGACY_DATA_FILENAME
+        )
+        if path.exists(legacy_data_fn) and not path.exists(self.data_fn):
+            DataStore.convert_json(legacy_data_fn, self.data_fn)
         return
         
 
+    def _init_data_writer(self):
+        """initialize and start the background thread which writes data to 
+        the data file
+        
+        Values which were logged in the write-ahead log but not written to the
+        data file (e.g. because of a crash) are restored before the data are
+        loaded.
+        """
+        self.data_writer = DataWriter()
+        self.data_writer.start()
+        self.wal = WriteAheadLog(self.data_fn, submit=self.data_writer.submit)
+        self._wal_checkpoint_pending = False
+        self._wal_size_limit = TimePlotGui.WAL_CHECKPOINT_SIZE
+        self._wal_errors = 0        # data_writer errors at last checkpoint
+        self.wal_checkpoint_signal.connect(self._wal_checkpoint_finished)
+        n_restored = self.wal.replay(DataStore(self.data_fn))
+        if n_restored > 0:
+            print('restored {} values from write-ahead log'.format(n_restored))
+
+    def _init_render_timer(self):
+        """initialize and start the timer which redraws the plot with the 
+        given frame_rate"""
+        self.render_timer = QtCore.QTimer(self)
+        self.render_timer.setInterval(int(1000/self.frame_rate))
+        self.render_timer.timeout.connect(self.render_frame)
+        self.render_timer.start()
+
+    def set_frame_rate(self, frame_rate):
+        """changes number of plot updates per second"""
+        self.frame_rate = frame_rate
+        self.render_timer.setInterval(int(1000/self.frame_rate))
+
+    def render_frame(self):
+        """takes over queued samples and redraws all data lines which 
+        received new samples since the last frame"""
+        self.drain_queues()
+        for data_item in self.data_table.values():
+            data_item.update_plot()
+        self.update_spectrogram()
+
     def _check_devices_type(self, devices):
         """checks devices and reformats if necessary
         
@@ -421,8 +516,17 @@ class TimePlotGui(QWidget):
         data_item = TimePlotDataItem(
             data_fn = self.data_fn, 
             id_nr=id_nr, 
-            absolute_time=self.t0
+            absolute_time=self.t0,
+            max_samples=self.max_samples,
+            max_timespan=self.max_timespan,
+            store_dtype=self.store_dtype,
+            writer=self.data_writer,
+            wal=self.wal
         )
+        # live spectrum state of the transform menu
+        data_item.set_live_spectrum_mode(self.live_spectrum_mode)
+        if self.live_spectrum_params:
+            data_item.set_live_spectrum_params(**self.live_spectrum_params)
         return data_item
 
     def _add_data_item(self, id_nr, data_item):
@@ -440,6 +544,7 @@ class TimePlotGui(QWidget):
             {id_nr: data_item}
         )
         self.graphItem.addItem(data_item.get_plot_data_item())
+        self._data_table_changed()
 
     def _remove_data_item(self, id_nr):
         """add data_item to data_table and to plot item
@@ -454,7 +559,13 @@ class TimePlotGui(QWidget):
             self.data_table[id_nr].get_plot_data_item()
         )
         self.data_table.pop(id_nr)
+        self._data_table_changed()
 
+    def _data_table_changed(self):
+        """updates context menu entries which depend on the data lines"""
+        # data table is initialized before the context menu
+        if hasattr(self, 'context_menu'):
+            self.context_menu.update_spectrogram_line_range()
 
     def _create_absolute_time_stamp(self):
         self.t0 = time.time()
@@ -481,8 +592,8 @@ class TimePlotGui(QWidget):
             if not np.isclose(self.t0, data_item.absolute_time, rtol=1e-3):
                 dt = data_item.absolute_time - self.t0
                 t,y = data_item.get_data()
-                data_item.set_data(t+dt, y)
                 data_item.absolute_time = self.t0
+                data_item.set_data(t+dt, y)
 
     def thread_status_changed(self):
         self.started = not self.started
@@ -818,7 +929,7 @@ class TimePlotGui(QWidget):
             self,
             'Select data file',
             '~/',
-            "JSON files (*.json)"
+            "Data index or JSON files (*.json)"
         )
         if data_fname != '':
             settings_fname, file_info = QFileDialog.getOpenFileName(
@@ -857,6 +968,38 @@ class TimePlotGui(QWidget):
                 dataitem.stop_local_ft_mode()
         return
 
+    def set_live_spectrum_mode(self, live_mode):
+        """switches FFT mode between the transform of the whole data lines and
+        the live spectrum depending on live spectrum checkbox state
+        """
+        self.live_spectrum_mode = bool(live_mode)
+        for dataitem in self.data_table.values():
+            dataitem.set_live_spectrum_mode(bool(live_mode))
+
+    def set_live_spectrum_segment_len(self, segment_len):
+        """sets number of values per segment of the live spectrum"""
+        self.live_spectrum_params['segment_len'] = segment_len
+        for dataitem in self.data_table.values():
+            dataitem.set_live_spectrum_params(segment_len=segment_len)
+
+    def show_spectrogram(self, show):
+        """shows or hides the spectrogram plot depending on spectrogram 
+        checkbox state"""
+        self.spectrogram_plot.setVisible(bool(show))
+        self.update_spectrogram()
+
+    def set_spectrogram_line(self, id_nr):
+        """selects the data line shown in the spectrogram plot"""
+        self.spectrogram_id_nr = id_nr
+        self.update_spectrogram()
+
+    def update_spectrogram(self):
+        """updates spectrogram plot with new values of the selected line"""
+        data_item = self.data_table.get(self.spectrogram_id_nr)
+        if self.spectrogram_plot.data_item is not data_item:
+            self.spectrogram_plot.set_data_item(data_item)
+        self.spectrogram_plot.update_image()
+
     def clear_all_plot_data_items(self):
         """remove all PlotDataItems from PLotItem"""
         data_items = self.graphItem.listDataItems()
@@ -877,39 +1020,68 @@ class TimePlotGui(QWidget):
             line_settings = self.settings['line_settings']
         )
 
-    @disable_fft_and_log_mode
     def store_all_data(self):
         """store all data objects
 
         Function stores data of every data_item by calling its store_data().
-        To avoid problems when importing data the next time this function
-        temporarily disables FFT, x log, and y log mode.
+        Since data are appended to the recording, only values which were not
+        stored yet are written. Data lines which are not present in the 
+        data_table anymore are removed from the recording. Write operations
+        are performed asynchronously by the data_writer. Once they are 
+        completed the write-ahead log is truncated unless a write failed.
+        Since raw data are stored independently of the display transform, 
+        FFT and log mode stay unchanged.
 
         """
-
-        # # save current state
-        # frequency_state = self.frequency_state
-        # x_log_check = self.context_menu.x_log_check.isChecked()
-        # y_log_check = self.context_menu.y_log_check.isChecked()
-
-        # # disable FFT, x log, and y log mode
-        # self.graphItem.ctrl.fftCheck.setChecked(False)
-        # self.context_menu.x_log_check.setChecked(False)
-        # self.context_menu.y_log_check.setChecked(False)
-
         # sava data
-        if path.exists(self.data_fn):
-            os.remove(self.data_fn)
+        wal_position = self.wal.tell()
+        names = [data_item.data_name for data_item in self.data_table.values()]
+        for name in DataStore(self.data_fn).get_names():
+            if name not in names:
+                self.data_writer.remove(self.data_fn, name)
         for data_item in self.data_table.values():
             data_item.store_data()
+        self._wal_checkpoint_pending = True
+        if self.data_writer.is_alive():
+            self.data_writer.submit(self._checkpoint_wal, wal_position)
+        else:
+            self._checkpoint_wal(wal_position)
 
-        # # restore FFT,x log, and y log states
-        # self.graphItem.ctrl.fftCheck.setChecked(frequency_state)
-        # self.context_menu.x_log_check.setChecked(x_log_check)
-        # self.context_menu.y_log_check.setChecked(y_log_check)
+    def _checkpoint_wal(self, position):
+        """truncates write-ahead log after data are written to data file
+        
+        Runs in the data_writer thread after all write requests put before.
+        If any of the requests since the previous checkpoint failed, the log 
+        keeps the values which are missing in the data file and is not 
+        truncated. They are restored from the log on the next start.
+        """
+        success = False
+        try:
+            n_errors = self.data_writer.get_metrics()['errors']
+            failed = n_errors > self._wal_errors
+            self._wal_errors = n_errors
+            if failed:
+                print('write-ahead log is not truncated since writing to '
+                      'the data file failed')
+            else:
+                self.wal.checkpoint(position)
+                success = True
+        finally:
+            self.wal_checkpoint_signal.emit(success)
+
+    def _wal_checkpoint_finished(self, success):
+        """allows the next checkpoint once the log grew by 
+        WAL_CHECKPOINT_SIZE. Runs in the gui thread."""
+        self._wal_checkpoint_pending = False
+        self._wal_size_limit = self.wal.size + TimePlotGui.WAL_CHECKPOINT_SIZE
 
     def change_time_markers(self, relative_time):
-        self.axis_item.relative_time = relative_time
+        self.axis_item.set_relative_time(relative_time)
+
+    def set_time_resolution(self, resolution):
+        """sets resolution of absolute time markers. 'auto' selects the
+        resolution from the tick spacing."""
+        self.axis_item.set_resolution(resolution)
 
     def set_all_autosave(self, autosave):
         for data_item in self.data_table.values():
@@ -971,26 +1143,24 @@ class TimePlotGui(QWidget):
     def _init_multi_worker_thread(self, devices):
         """initializes a worker thread for every devicewrapper in devices"""
 
-        # set up QWaitCondition
-        self.mutex_table = {
-            idx: QMutex() for idx in range(len(devices))
-        }
-        self.cond_table = {
-            idx: QWaitCondition() for idx in range(len(devices))
+        # set up sample queues between device threads and gui
+        self.queue_table = {
+            idx: SampleQueue(capacity=self.queue_size, overflow=self.overflow)
+            for idx in range(len(devices))
         }
+        self._drain_times = {idx: time.time() for idx in self.queue_table}
 
         # set up the measurement engine
         self.worker_table = {}
         for idx, devicewrapper in enumerate(devices):
             worker = TimePlotWorker(
                 devicewrapper,
-                self.mutex_table[idx],
-                self.cond_table[idx],
-                id_nr=idx
+                self.queue_table[idx],
+                id_nr=idx,
+                sampling_latency=self.sampling_latency
             )
 
             # connect signal and slot
-            worker.reading.connect(self.newReading)
             self.start_signal.connect(worker.start)
             self.stop_signal.connect(worker.stop)
             self.pause_signal.connect(worker.pause)
@@ -998,6 +1168,53 @@ class TimePlotGui(QWidget):
 
             self.worker_table.update({idx: worker})
 
+    def drain_queues(self, force=False):
+        """appends samples queued by the device threads to the data lines
+
+        The samples of a queue are taken over once block_size samples are 
+        queued or block_interval seconds passed since the last takeover. 
+        Without block_size and block_interval, queued samples are taken over
+        on every call.
+
+        Parameter
+        ---------
+        force : bool
+            takes over all queued samples independent of block_size and 
+            block_interval
+
+        """
+        now = time.time()
+        for id_nr, sample_queue in self.queue_table.items():
+            if not force and not self._is_block_ready(id_nr, now):
+                continue
+            self._drain_times[id_nr] = now
+            t, y = sample_queue.drain()
+            if len(t) > 0 and id_nr in self.data_table:
+                self.update_datablock(id_nr, t, y)
+
+    def _is_block_ready(self, id_nr, now):
+        """checks if queued samples of device id_nr are taken over"""
+        if self.block_size is None and self.block_interval is None:
+            return True
+        if self.block_size is not None:
+            # a full queue is taken over even if block_size exceeds capacity
+            sample_queue = self.queue_table[id_nr]
+            if len(sample_queue) >= min(self.block_size, sample_queue.capacity):
+                return True
+        return self.block_interval is not None and \
+            now - self._drain_times[id_nr] >= self.block_interval
+
+    def get_queue_metrics(self):
+        """returns counters of the sample queues (e.g. dropped samples) and
+        the number of samples which could not be acquired in time 
+        ('late_runs') for every data line"""
+        metrics = {}
+        for id_nr, sample_queue in self.queue_table.items():
+            metrics[id_nr] = sample_queue.get_metrics()
+            metrics[id_nr]['late_runs'] = \
+                self.worker_table[id_nr].get_late_runs()
+        return metrics
+
     def leaving_fft_mode(self):
 
         msg = """
@@ -1068,13 +1285,14 @@ class TimePlotGui(QWidget):
         # time.sleep(2)
         self.stop_signal.emit()
 
-    @disable_fft_and_log_mode
     def update_datapoint(self, id_nr, val, time_val):
         """updates TimePlotDataItem object with corresponding id_nr
         
         To account for the fact that different lines are present, the 
         ``id_nr`` variable selects the right ``TimePlotdataItem`` object from
-        the ``data_table`` and appends the values.
+        the ``data_table`` and appends the values. Values are appended to the
+        raw data independent of the FFT and log mode. Only the display data
+        of the line are invalidated, the mode checkboxes are not touched.
         
         Parameter
         ---------
@@ -1087,44 +1305,34 @@ class TimePlotGui(QWidget):
         
         
         """
+        # update value. Plot is redrawn by render_frame()
+        self.data_table[id_nr].append_value(val, time_val, update=False)
+        self._check_wal_size()
+
+    def update_datablock(self, id_nr, t, y):
+        """appends block of values to TimePlotDataItem object with 
+        corresponding id_nr
+
+        Parameter
+        ---------
+        id_nr : int
+            identifier for ``TimePlotDataItem`` in ``data_table``
+        t : ndarray
+            time stamps of collected values
+        y : ndarray
+            collected values from measurement instrument
+
+        """
+        self.data_table[id_nr].append_block(t, y, update=False)
+        self._check_wal_size()
+
+    def _check_wal_size(self):
+        """saves all data if write-ahead log grew too large"""
+        if not self._wal_checkpoint_pending and \
+                self.wal.size > self._wal_size_limit:
+            self.store_all_data()
 
-        # # save current state
-        # frequency_state = self.frequency_state
-        # x_log_check = self.context_menu.x_log_check.isChecked()
-        # y_log_check = self.context_menu.y_log_check.isChecked()
-
-        # # disable FFT, x log, and y log state
-        # self.graphItem.ctrl.fftCheck.setChecked(False)
-        # self.context_menu.x_log_check.setChecked(False)
-        # self.context_menu.y_log_check.setChecked(False)
-
-        # update value
-        self.data_table[id_nr].append_value(val, time_val)
-
-        # # reinstate FFT, x log, and y log state
-        # self.graphItem.ctrl.fftCheck.setChecked(frequency_state)
-        # self.context_menu.x_log_check.setChecked(x_log_check)
-        # self.context_menu.y_log_check.setChecked(y_log_check)
-
-
-    @QtCore.pyqtSlot(int, float, float)
-    def newReading(self, id_nr, val, time_val):
-        """updates plot by adding provided value to corresponding 
-        ``TimePlotDataItem`` object """
-        pg.QtGui.QApplication.processEvents()
-        t0 = time.time()
-        self.update_datapoint(id_nr, val, time_val)
-        dt = self.sampling_latency - (time.time()-t0)
-        if dt > 0:
-            time.sleep(dt)
-        else:
-            time.sleep(0.001)
-#        time.sleep(self.sampling_latency)
-        # necessary to avoid worker to freeze
-        self.cond_table[id_nr].wakeAll()     # wake worker thread up
-        return
 
-    
     # def disable_fft_and_log_mode(func):
     #     def wrapper(tpg, *args, **kwargs):
     #         print("inhere")
@@ -1176,10 +1384,19 @@ class TimePlotGui(QWidget):
             return True
 
     def accept_close_event(self, event):
-        """runs standard protocol for closing the GUI properly"""
+        """runs standard protocol for closing the GUI properly
+        
+        Workers are stopped first such that all queued samples are 
+        included. Pending data are written to the data file before the 
+        data_writer thread is stopped.
+        """
+        self.render_timer.stop()
+        self.stop_thread()
+        self.drain_queues(force=True)
         self.save_current_settings()
         self.store_all_data()
-        self.stop_thread()
+        self.data_writer.stop()
+        self.wal.close()
         event.accept()
 
 # # ========================================================================
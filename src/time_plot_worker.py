@@ -34,14 +34,39 @@ except:
 # =============================================================================
 
 class TimePlotWorker(QObject):       # change class name to MeasurementEngine ?
-    """ """
+    """reads values from device in the device worker thread and hands them
+    to the GUI
+
+    Every value is put into a SampleQueue together with its time stamp. The
+    worker does not wait for the GUI: the GUI drains the queue on every 
+    frame (or once a configured block size or interval is reached, see 
+    TimePlotGui) and appends all values which arrived as one block. The 
+    sampling rate therefore does not depend on how long the GUI needs to 
+    redraw.
+
+
+    Parameter
+    ---------
+    devicewrapper : DeviceWrapper
+        device from which values are read
+    sample_queue : SampleQueue
+        queue into which values are put. The worker is its only producer.
+    id_nr : int
+        data line identification number
+    sampling_latency : float
+        time in seconds between two values. Values are read periodically with
+        this period on the clock of the device thread, i.e. the sampling rate
+        does not drift. None reads values as fast as the device provides 
+        them.
+
+    """
 
-    reading = pyqtSignal(int, float, float)
     finished = pyqtSignal()
     started = pyqtSignal()
     killed = pyqtSignal()
 
-    def __init__(self, devicewrapper , mutex, cond, *args, id_nr=0, **kwargs):
+    def __init__(self, devicewrapper , sample_queue, *args, id_nr=0, 
+                 sampling_latency=None, **kwargs):
         """ """
         QObject.__init__(self)
         print('worker initialized')
@@ -50,8 +75,8 @@ class TimePlotWorker(QObject):       # change class name to MeasurementEngine ?
         self.dd = self.dw.d
         self.id_nr = id_nr
 
-        self.mtx = mutex
-        self.cond = cond
+        self.queue = sample_queue
+        self.sampling_latency = sampling_latency
         self._init_workertask()
 
         self.is_paused = False
@@ -59,31 +84,26 @@ class TimePlotWorker(QObject):       # change class name to MeasurementEngine ?
 
 
     def _init_workertask(self):
-        wtask = WorkerTaskBase(
+        self.task = WorkerTaskBase(
             func=self.dd.get_value,
             continuous=True,
-            callback=self.read_value
+            callback=self.read_value,
+            period=self.sampling_latency or None
         )
-        self.wt.put(wtask)
+        self.wt.put(self.task)
 
+    def get_late_runs(self):
+        """returns number of values which could not be read in time. Values
+        not read while the worker is paused are not counted."""
+        return self.task.late_runs
 
-    def read_value(self, val, verbose=True):
-        if self.is_paused:
-            self.mtx.lock()
-            self.cond.wait(self.mtx)
-            self.mtx.unlock()
+
+    def read_value(self, val, verbose=False):
 
         if verbose:
             print('read val: {:.2f}'.format(val))
 
-        self.mtx.lock()                 # lock worker-thread
-        time_val = time.time()
-        arg = []
-        arg.append(val)
-        arg.append(time_val)
-        self.reading.emit(self.id_nr, val, time_val)          # emit signalt to update gui
-        self.cond.wait(self.mtx)        # wait until gui is updated
-        self.mtx.unlock()               # unlock worker thread
+        self.queue.put(time.time(), val)
 
 
     @pyqtSlot()
@@ -101,6 +121,7 @@ class TimePlotWorker(QObject):       # change class name to MeasurementEngine ?
         """ """
         print('pause worker')
         self.is_paused = True
+        self.wt.pause_task(self.task)
         # self.mtx.lock()
         # print('locked')
         # self.cond.wait(self.mtx)
@@ -111,13 +132,14 @@ class TimePlotWorker(QObject):       # change class name to MeasurementEngine ?
         """ """
         print('restart worker')
         self.is_paused = False
-        self.cond.wakeAll()
+        self.wt.resume_task(self.task)
         # self.mtx.unlock()
         # print('here')
 
     @pyqtSlot()
     def stop(self):
         self.wt.stop()
+        self.queue.close()
         print('stopped worker')
 
         # inform mainWindow
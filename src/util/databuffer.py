@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DataBuffer class is used to store the time and value arrays of a data line.
+
+DataBuffer keeps the data in preallocated numpy arrays whose capacity is
+doubled whenever they run full. Appending a value therefore costs amortized
+O(1) instead of copying the complete data arrays on every call as it is the
+case with ``np.append``. The stored data are accessible as zero-copy views.
+DataBuffer can be limited to a rolling window of the most recent values. 
+Since time values are increasing, time ranges are found by binary search.
+
+
+Example::
+    >>> buf = DataBuffer()
+    >>> buf.append(0.1, 5.)
+    >>> t, y = buf.get_data()
+    >>> t, y = buf.get_range(0., 1.)
+
+"""
+
+import numpy as np
+
+
+
+class DataBufferException(Exception):
+    pass
+
+
+def get_range_indices(t, tmin=None, tmax=None):
+    """returns start and stop index of the values in [tmin, tmax]
+
+    Uses binary search and therefore requires t to be sorted in increasing 
+    order.
+
+    Parameter
+    ---------
+    t : ndarray
+        increasing time values
+    tmin, tmax : float
+        range boundaries. None means unbounded.
+
+    Return
+    ------
+    tuple
+        (start, stop) such that t[start:stop] contains all values in range
+
+    """
+    start = 0 if tmin is None else int(np.searchsorted(t, tmin, side='left'))
+    stop = len(t) if tmax is None else int(
+        np.searchsorted(t, tmax, side='right')
+    )
+    return start, max(start, stop)
+
+
+class DataBuffer():
+    """Growable storage for time and value arrays of one data line
+
+    Data are stored in two preallocated numpy arrays. When the arrays run full
+    their capacity is doubled, which results in amortized O(1) cost per
+    appended value. ``get_data()`` returns views on the filled part of the
+    arrays such that no data is copied when the data are handed over to the
+    plot items.
+
+    Optionally, the buffer can be restricted to a rolling window given by a 
+    maximum number of values (max_len) and/or a maximum time span 
+    (max_span). Values which fall out of the window are evicted from the front
+    of the buffer and handed to evict_callback so that they can be stored on 
+    disk instead of being dropped. Evicted values stay in place until the 
+    buffer is compacted which allows to hand them over in large blocks. With
+    max_len set, the arrays are preallocated with twice the window size and
+    compaction happens every max_len appends only.
+
+    Note:
+        Views returned by ``get_data()`` stay valid when new values are
+        appended or evicted. They do not reflect values appended afterwards.
+        ``clear()`` and ``set_data()`` reuse the memory of the arrays.
+
+
+    Parameter
+    ---------
+    capacity : int
+        number of values which can be stored before the arrays are enlarged
+    dtype : numpy dtype
+        data type of the value array. Time array is always float64.
+    max_len : int
+        maximum number of values kept in the buffer. None means unlimited.
+    max_span : float
+        maximum time span between first and last value kept in the buffer.
+        None means unlimited.
+    evict_callback : callable
+        function called with the time and value arrays of evicted values as
+        arguments before they are removed from the buffer
+
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, capacity=None, dtype=np.float64, max_len=None, 
+                 max_span=None, evict_callback=None):
+        self.max_len = self._check_max_len(max_len)
+        self.max_span = max_span
+        self.evict_callback = evict_callback
+        if capacity is None:
+            capacity = DataBuffer.INITIAL_CAPACITY
+            if self.max_len is not None:
+                capacity = 2*self.max_len
+        self.dtype = dtype
+        self._t = np.empty(max(1, int(capacity)), dtype=np.float64)
+        self._y = np.empty(max(1, int(capacity)), dtype=self.dtype)
+        self._released = 0      # first value not handed to evict_callback
+        self._start = 0         # first value inside the window
+        self._end = 0           # end of the filled part of the arrays
+        self.n_evicted = 0      # number of values evicted since last clear
+
+    def _check_max_len(self, max_len):
+        err_msg = 'max_len needs to be a positive integer: {}'.format(max_len)
+
+        if max_len is None:
+            return max_len
+        if int(max_len) < 1:
+            raise DataBufferException(err_msg)
+        return int(max_len)
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def n_total(self):
+        """number of values appended since last clear including evicted ones"""
+        return self.n_evicted + len(self)
+
+    @property
+    def capacity(self):
+        """number of values which fit in the currently allocated arrays"""
+        return len(self._t)
+
+    def _is_writeable(self):
+        return self._t.flags.writeable and self._y.flags.writeable
+
+    def _reserve(self, n):
+        """makes sure that n more values can be appended to the arrays
+
+        Evicted values are released first. The window is then copied to the
+        front of newly allocated arrays which are enlarged if necessary. The
+        window is never moved inside the current arrays since this would 
+        change the values seen through views returned by ``get_data()``
+        before, e.g. by the plot items until their next redraw.
+        """
+        if self._end + n <= self.capacity and self._is_writeable():
+            return
+        self.release_evicted()
+        n_window = len(self)
+        capacity = self.capacity
+        while capacity < n_window + n:
+            capacity *= 2
+        t = np.empty(capacity, dtype=np.float64)
+        y = np.empty(capacity, dtype=self.dtype)
+        t[:n_window] = self._t[self._start:self._end]
+        y[:n_window] = self._y[self._start:self._end]
+        self._t, self._y = t, y
+        self._released = self._start = 0
+        self._end = n_window
+
+    def _evict(self):
+        """moves the window start such that max_len and max_span are met"""
+        start = self._start
+        if self.max_len is not None and len(self) > self.max_len:
+            start = self._end - self.max_len
+        if self.max_span is not None and self._end > start:
+            t_min = self._t[self._end-1] - self.max_span
+            start += int(np.searchsorted(
+                self._t[start:self._end], t_min, side='left'
+            ))
+        self.n_evicted += start - self._start
+        self._start = start
+
+    def release_evicted(self):
+        """hands all evicted values which are still in place to the 
+        evict_callback function"""
+        if self._released == self._start:
+            return
+        if self.evict_callback is not None:
+            self.evict_callback(
+                self._t[self._released:self._start],
+                self._y[self._released:self._start]
+            )
+        self._released = self._start
+
+    def append(self, t, y):
+        """appends a single time and data value"""
+        if self._end == self.capacity:
+            self._reserve(1)
+        self._t[self._end] = t
+        self._y[self._end] = y
+        self._end += 1
+        if self.max_len is not None or self.max_span is not None:
+            self._evict()
+
+    def extend(self, t, y):
+        """appends arrays of time and data values
+
+        Parameter
+        ---------
+        t : array-like
+            time values
+        y : array-like
+            data values. Needs to have the same length as t.
+
+        """
+        t = np.asarray(t, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=self.dtype).ravel()
+        if len(t) != len(y):
+            raise DataBufferException(
+                'time and data array lengths differ: {} != {}'.format(
+                    len(t), len(y)
+                )
+            )
+        n = len(t)
+        self._reserve(n)
+        self._t[self._end:self._end+n] = t
+        self._y[self._end:self._end+n] = y
+        self._end += n
+        if self.max_len is not None or self.max_span is not None:
+            self._evict()
+
+    def set_data(self, t, y, copy=True):
+        """replaces the stored data with the given time and data arrays
+
+        Parameter
+        ---------
+        t : array-like
+            time values
+        y : array-like
+            data values
+        copy : bool
+            if False, given numpy arrays are used as storage arrays without
+            copying them. This allows to use read-only arrays like 
+            numpy.memmap objects. They are copied into newly allocated arrays 
+            as soon as values are appended.
+
+        """
+        self.clear()
+        if copy:
+            self.extend(t, y)
+            return
+        if len(t) != len(y):
+            raise DataBufferException(
+                'time and data array lengths differ: {} != {}'.format(
+                    len(t), len(y)
+                )
+            )
+        if len(t) == 0:
+            return
+        self._t, self._y = t, y
+        self._end = len(t)
+        if self.max_len is not None or self.max_span is not None:
+            self._evict()
+
+    def clear(self):
+        """removes all stored values. Allocated memory is kept.
+        
+        Evicted values which were not released yet are handed to the 
+        evict_callback function before.
+        """
+        self.release_evicted()
+        self._released = self._start = self._end = 0
+        self.n_evicted = 0
+        if not self._is_writeable():
+            self._t = np.empty(DataBuffer.INITIAL_CAPACITY, dtype=np.float64)
+            self._y = np.empty(DataBuffer.INITIAL_CAPACITY, dtype=self.dtype)
+
+    def get_data(self):
+        """returns zero-copy views of the time and data array"""
+        return (
+            self._t[self._start:self._end], 
+            self._y[self._start:self._end]
+        )
+
+    def get_range(self, tmin=None, tmax=None):
+        """returns zero-copy views of the values with tmin <= t <= tmax
+
+        Range boundaries are found by binary search in O(log n). Time values 
+        need to be appended in increasing order.
+
+        Parameter
+        ---------
+        tmin, tmax : float
+            range boundaries. None means unbounded.
+
+        """
+        t, y = self.get_data()
+        start, stop = get_range_indices(t, tmin, tmax)
+        return t[start:stop], y[start:stop]
@@ -0,0 +1,883 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DataStore class is used to store the data lines of a TimePlotGui recording.
+
+A recording is a folder which contains one binary file per data line and
+column (time and value) plus a small JSON index. Every column is stored as a 
+contiguous array of raw float values such that it can be opened with 
+``numpy.memmap``. Loading a recording is therefore independent of its size and
+values are only read from disk when they are accessed. Data are appended to the
+binary files such that every save only writes the values added since the last
+save. The index keeps the number of valid values and the absolute time of
+every data line. Values beyond the number given in the index (e.g. from an
+interrupted write) are ignored and overwritten on the next append.
+
+Folder layout::
+
+    stored_data/
+        index.json
+        data_0.t        float64 time values relative to absolute_time
+        data_0.y        float64 or float32 data values
+        data_1.t
+        ...
+
+Recordings stored in the previous JSON file format can be converted with
+``DataStore.convert_json``.
+
+DataWriter class performs the write operations of a DataStore in a background
+WorkerThread to keep file access out of the GUI thread.
+
+WriteAheadLog class logs every value batch before it is written to the 
+recording. Values which were not written to the recording because of a crash
+are restored from the log on the next start.
+
+
+Example::
+    >>> ds = DataStore('saved_info/stored_data')
+    >>> ds.append('data_0', t, y, absolute_time=t0)
+    >>> t, y, t0 = ds.load('data_0')
+
+"""
+
+import os
+from os import path
+import json
+import struct
+import zlib
+
+import threading
+import queue
+import time
+
+import numpy as np
+
+try:
+    from .workerthread import WorkerThread, WorkerTaskBase
+except:
+    from workerthread import WorkerThread, WorkerTaskBase
+
+
+
+class DataStoreException(Exception):
+    pass
+
+
+class DataStore():
+    """Append-only binary storage for the data lines of a recording
+
+    Parameter
+    ---------
+    folder : str
+        recording folder. Folder is created if it does not exist.
+    dtype : str
+        data type of the value column of new data lines. 'float64' or 
+        'float32'. Time values are always stored as float64. Existing data 
+        lines keep the data type they were created with.
+
+    """
+
+    INDEX_FN = 'index.json'
+    COLUMN_FN = '{}.{}'
+    COLUMNS = ('t', 'y')
+    VERSION = 1
+    DTYPES = ('float64', 'float32')
+    TIME_DTYPE = 'float64'
+    COPY_SIZE = 2**24               # bytes copied at once by copy()
+
+    def __init__(self, folder, dtype='float64'):
+        self.folder = folder
+        self.dtype = self._check_dtype(dtype)
+        if not path.exists(self.folder):
+            os.makedirs(self.folder)
+        self.index_fn = path.join(self.folder, DataStore.INDEX_FN)
+        self.index = self._load_index()
+
+    # ====
+    # index handling
+    # ====
+
+    def _load_index(self):
+        if path.exists(self.index_fn):
+            with open(self.index_fn, mode='r') as index_file:
+                index = json.load(index_file)
+            if index.get('version') != DataStore.VERSION:
+                raise DataStoreException(
+                    'index version not supported: {}'.format(self.index_fn)
+                )
+            return index
+        return {'version': DataStore.VERSION, 'lines': {}}
+
+    def _save_index(self):
+        """writes index to temporary file and replaces the old index with it
+        to avoid a corrupted index file in case of a crash"""
+        tmp_fn = self.index_fn + '.tmp'
+        with open(tmp_fn, mode='w') as index_file:
+            json.dump(self.index, index_file, sort_keys=True, indent=4)
+        os.replace(tmp_fn, self.index_fn)
+
+    def _check_dtype(self, dtype):
+        err_msg = 'dtype needs to be one of {}: {}'.format(
+            DataStore.DTYPES, dtype
+        )
+
+        dtype = np.dtype(dtype).name
+        if dtype not in DataStore.DTYPES:
+            raise DataStoreException(err_msg)
+        return dtype
+
+    def _column_fn(self, name, column):
+        return path.join(self.folder, DataStore.COLUMN_FN.format(name, column))
+
+    def get_names(self):
+        """returns list of data line names present in recording"""
+        return list(self.index['lines'].keys())
+
+    def has_line(self, name):
+        return name in self.index['lines']
+
+    def get_length(self, name):
+        """returns number of values stored for given data line"""
+        if not self.has_line(name):
+            return 0
+        return self.index['lines'][name]['n']
+
+    def get_dtypes(self, name, dtype=None):
+        """returns data types of time and value column of given data line
+        
+        If the data line does not exist yet, the given dtype or the dtype 
+        specified at initialization is returned for the value column.
+        """
+        if not self.has_line(name):
+            if dtype is None:
+                dtype = self.dtype
+            dtype = self._check_dtype(dtype)
+        else:
+            dtype = self.index['lines'][name].get('dtype', 'float64')
+        return DataStore.TIME_DTYPE, dtype
+
+    # ====
+    # write data
+    # ====
+
+    def append(self, name, t, y, absolute_time, dtype=None):
+        """appends time and data values to data line
+
+        Parameter
+        ---------
+        name : str
+            data line name
+        t : array-like
+            time values relative to absolute_time
+        y : array-like
+            data values
+        absolute_time : float
+            absolute time to which time values refer
+        dtype : str
+            data type of the value column if the data line is created. 
+            Defaults to the dtype given at initialization.
+
+        """
+        t_dtype, y_dtype = self.get_dtypes(name, dtype)
+        t = np.asarray(t, dtype=t_dtype)
+        y = np.asarray(y, dtype=y_dtype)
+        if len(t) != len(y):
+            raise DataStoreException(
+                'time and data array lengths differ: {} != {}'.format(
+                    len(t), len(y)
+                )
+            )
+        n = self.get_length(name)
+        for column, values in zip(DataStore.COLUMNS, (t, y)):
+            nbytes = n * values.itemsize
+            fn = self._column_fn(name, column)
+            if not path.exists(fn):
+                open(fn, mode='wb').close()
+            with open(fn, mode='r+b') as column_file:
+                column_file.truncate(nbytes)
+                column_file.seek(nbytes)
+                values.tofile(column_file)
+
+        self.index['lines'][name] = {
+            'n':                n + len(t),
+            'absolute_time':    absolute_time,
+            'dtype':            y_dtype
+        }
+        self._save_index()
+
+    def write(self, name, t, y, absolute_time, dtype=None):
+        """replaces data line with given time and data values"""
+        self.remove(name, save_index=False)
+        self.append(name, t, y, absolute_time, dtype)
+
+    def copy(self, source, name, n=None):
+        """replaces data line with the first n values of the same data line
+        in another recording
+
+        Column files are copied block-wise without converting the values, 
+        i.e. the data line keeps the data type of the source.
+
+        Parameter
+        ---------
+        source : DataStore
+            recording from which the data line is copied
+        name : str
+            data line name
+        n : int
+            number of copied values. None copies all values.
+
+        """
+        if path.abspath(source.folder) == path.abspath(self.folder):
+            return
+        if not source.has_line(name):
+            raise DataStoreException('data line {} not found in {}'.format(
+                name, source.folder
+            ))
+        if n is None:
+            n = source.get_length(name)
+        if n > source.get_length(name):
+            raise DataStoreException(
+                'data line {} in {} has less than {} values'.format(
+                    name, source.folder, n
+                )
+            )
+        dtypes = source.get_dtypes(name)
+        self.remove(name, save_index=False)
+        for column, dtype in zip(DataStore.COLUMNS, dtypes):
+            nbytes = n * np.dtype(dtype).itemsize
+            src_fn = source._column_fn(name, column)
+            with open(src_fn, mode='rb') as src_file, \
+                    open(self._column_fn(name, column), mode='wb') as dst_file:
+                while nbytes > 0:
+                    block = src_file.read(min(nbytes, DataStore.COPY_SIZE))
+                    if len(block) == 0:
+                        raise DataStoreException(
+                            'column file is incomplete: {}'.format(src_fn)
+                        )
+                    dst_file.write(block)
+                    nbytes -= len(block)
+
+        self.index['lines'][name] = {
+            'n':                n,
+            'absolute_time':    source.index['lines'][name]['absolute_time'],
+            'dtype':            dtypes[1]
+        }
+        self._save_index()
+
+    def remove(self, name, save_index=True):
+        """removes data line from recording"""
+        for column in DataStore.COLUMNS:
+            fn = self._column_fn(name, column)
+            if path.exists(fn):
+                os.remove(fn)
+        self.index['lines'].pop(name, None)
+        if save_index:
+            self._save_index()
+
+    # ====
+    # read data
+    # ====
+
+    def load(self, name, mmap=True):
+        """returns time values, data values, and absolute time of data line
+
+        Parameter
+        ---------
+        name : str
+            data line name
+        mmap : bool
+            if True, columns are returned as read-only numpy.memmap objects
+            and values are read from disk only when accessed. Otherwise 
+            columns are read into memory.
+
+        Return
+        ------
+        tuple
+            (t, y, absolute_time). None if data line is not present.
+
+        """
+        if not self.has_line(name):
+            return None
+        n = self.get_length(name)
+        columns = []
+        for column, dtype in zip(DataStore.COLUMNS, self.get_dtypes(name)):
+            fn = self._column_fn(name, column)
+            if n == 0:
+                values = np.empty(0, dtype=dtype)
+            elif mmap:
+                values = np.memmap(fn, dtype=dtype, mode='r', shape=(n,))
+            else:
+                values = np.fromfile(fn, dtype=dtype, count=n)
+            columns.append(values)
+        t, y = columns
+        return t, y, self.index['lines'][name]['absolute_time']
+
+    # ====
+    # conversion from JSON files
+    # ====
+
+    @staticmethod
+    def is_legacy_file(fn):
+        """checks if fn refers to data file in the JSON format used before"""
+        return path.isfile(fn) and path.basename(fn) != DataStore.INDEX_FN
+
+    @staticmethod
+    def convert_json(json_fn, folder=None):
+        """converts data file in JSON format into recording folder
+
+        The JSON file is expected to contain a dictionary of the form
+        ``{name: {'t': list, 'y': list, 'absolute_time': float}}``.
+
+        Parameter
+        ---------
+        json_fn : str
+            filename of JSON data file
+        folder : str
+            recording folder. Defaults to json_fn without file extension.
+
+        Return
+        ------
+        DataStore
+            store object of the converted recording
+
+        """
+        if folder is None:
+            folder = path.splitext(json_fn)[0]
+        with open(json_fn, mode='r') as json_file:
+            all_data_dct = json.load(json_file)
+
+        store = DataStore(folder)
+        for name, data_dct in all_data_dct.items():
+            store.write(
+                name,
+                data_dct['t'],
+                data_dct['y'],
+                data_dct['absolute_time']
+            )
+        return store
+
+    @staticmethod
+    def open(fn):
+        """returns DataStore object for given recording
+
+        Parameter
+        ---------
+        fn : str
+            recording folder, index file of a recording, or data file in the
+            previous JSON format. JSON data files are converted into a
+            recording folder next to them if not done before.
+
+        """
+        if path.basename(fn) == DataStore.INDEX_FN:
+            return DataStore(path.dirname(fn))
+        if DataStore.is_legacy_file(fn):
+            folder = path.splitext(fn)[0]
+            if path.exists(path.join(folder, DataStore.INDEX_FN)):
+                return DataStore(folder)
+            return DataStore.convert_json(fn, folder)
+        return DataStore(fn)
+
+
+# ===========================================================================
+# Background writer
+# ===========================================================================
+
+class DataWriter():
+    """Writes data to DataStore recordings in a background thread
+
+    Write requests are put as WorkerTaskBase objects in a bounded queue which
+    is processed by a WorkerThread. Values handed to the writer are copied 
+    such that the caller can continue to modify its arrays. If the queue is 
+    full, requests block until the backlog is reduced. 
+
+
+    Parameter
+    ---------
+    maxsize : int
+        maximum number of write requests waiting in the queue
+
+
+    Example::
+        >>> dw = DataWriter()
+        >>> dw.start()
+        >>> dw.append('saved_info/stored_data', 'data_0', t, y, t0)
+        >>> dw.flush()
+        >>> dw.stop()
+
+    """
+
+    MAXSIZE = 1000
+
+    def __init__(self, maxsize=None):
+        if maxsize is None:
+            maxsize = DataWriter.MAXSIZE
+        self.q = queue.Queue(maxsize=maxsize)
+        self.wt = WorkerThread(self.q)
+        self.wt.daemon = True
+        self._stores = {}
+        self._lock = threading.Lock()
+        self.metrics = {
+            'pending_values':   0,
+            'written_values':   0,
+            'written_requests': 0,
+            'max_backlog':      0,
+            'write_time':       0.,
+            'errors':           0,
+        }
+
+    def start(self):
+        """starts the background thread"""
+        if not self.wt.is_alive():
+            self.wt.start()
+
+    def stop(self):
+        """writes all pending requests and stops the background thread"""
+        if self.wt.is_alive():
+            self.flush()
+            self.wt.stop()
+
+    def is_alive(self):
+        return self.wt.is_alive()
+
+    def _get_store(self, folder):
+        """returns DataStore object of given folder. Only called from the
+        background thread."""
+        if folder not in self._stores:
+            self._stores[folder] = DataStore(folder)
+        return self._stores[folder]
+
+    def _put(self, func, args, n_values=0):
+        """puts write request in queue and updates backlog metrics"""
+        task = WorkerTaskBase(
+            func=self._process,
+            args=(func, args, n_values)
+        )
+        with self._lock:
+            self.metrics['pending_values'] += n_values
+        self.wt.put(task)
+        with self._lock:
+            self.metrics['max_backlog'] = max(
+                self.metrics['max_backlog'], self.q.qsize()
+            )
+
+    def _process(self, func, args, n_values):
+        """executes write request. Runs in the background thread."""
+        t0 = time.perf_counter()
+        try:
+            func(*args)
+        except Exception as e:
+            print('DataWriter: write request failed: {}'.format(e))
+            with self._lock:
+                self.metrics['errors'] += 1
+        with self._lock:
+            self.metrics['pending_values'] -= n_values
+            self.metrics['written_values'] += n_values
+            self.metrics['written_requests'] += 1
+            self.metrics['write_time'] += time.perf_counter() - t0
+
+    def _append(self, folder, name, t, y, absolute_time, dtype):
+        self._get_store(folder).append(name, t, y, absolute_time, dtype)
+
+    def _write(self, folder, name, t, y, absolute_time, dtype):
+        self._get_store(folder).write(name, t, y, absolute_time, dtype)
+
+    def _remove(self, folder, name):
+        self._get_store(folder).remove(name)
+
+    def _copy(self, folder, source_folder, name, n):
+        self._get_store(folder).copy(DataStore(source_folder), name, n)
+
+    def append(self, folder, name, t, y, absolute_time, dtype=None):
+        """appends copy of values to data line. See DataStore.append()"""
+        t = np.array(t, dtype=np.float64)
+        y = np.array(y)
+        self._put(
+            self._append, (folder, name, t, y, absolute_time, dtype), len(t)
+        )
+
+    def write(self, folder, name, t, y, absolute_time, dtype=None):
+        """replaces data line by copy of values. See DataStore.write()"""
+        t = np.array(t, dtype=np.float64)
+        y = np.array(y)
+        self._put(
+            self._write, (folder, name, t, y, absolute_time, dtype), len(t)
+        )
+
+    def remove(self, folder, name):
+        """removes data line from recording. See DataStore.remove()"""
+        self._put(self._remove, (folder, name))
+
+    def copy(self, folder, source_folder, name, n=None):
+        """replaces data line by the data line of another recording. See 
+        DataStore.copy()"""
+        self._put(self._copy, (folder, source_folder, name, n), n or 0)
+
+    def submit(self, func, *args):
+        """executes func(*args) in the background thread after all requests 
+        put before"""
+        self._put(func, args)
+
+    def flush(self, timeout=None):
+        """blocks until all requests put before are written
+        
+        Return
+        ------
+        bool
+            False if timeout expired before all requests were written
+        """
+        if not self.wt.is_alive():
+            return self.q.empty()
+        done = threading.Event()
+        self.wt.put(WorkerTaskBase(func=done.set))
+        return done.wait(timeout)
+
+    def get_metrics(self):
+        """returns dictionary with write backlog metrics
+        
+        backlog gives the number of queued requests, pending_values the number
+        of values waiting to be written.
+        """
+        with self._lock:
+            metrics = self.metrics.copy()
+        metrics['backlog'] = self.q.qsize()
+        return metrics
+
+
+# ===========================================================================
+# Write-ahead log
+# ===========================================================================
+
+class WriteAheadLog():
+    """Crash-safe log of all value batches added to a recording
+
+    Every value batch is appended as a record to a log file in the recording
+    folder before it is handed to the (asynchronous) DataStore writes. Records
+    are written sequentially and the file is synced to disk (fsync) at most 
+    once every sync_interval seconds. After all logged values are written to 
+    the recording the log is truncated by calling ``checkpoint()``. On the
+    next start, ``replay()`` writes logged values which are missing in the 
+    recording.
+
+    A record contains the data line name, the index of its first value 
+    counted from the last data reset, the absolute time, and the time and 
+    data values. Records with the reset flag replace the data line. Copy 
+    records replace the data line by values of another recording on disk. 
+    They contain the folder of this recording and the number of copied 
+    values (in place of the index) instead of time and data values. Every 
+    record carries a CRC32 checksum such that a partially written record at 
+    the end of the log is detected and ignored.
+
+
+    Parameter
+    ---------
+    folder : str
+        recording folder
+    sync_interval : float
+        minimum time in s between two fsync calls
+    submit : callable
+        function used to execute the fsync call, e.g. DataWriter.submit. If 
+        None, fsync is called directly.
+
+    """
+
+    LOG_FN = 'wal.bin'
+    MAGIC = b'TPGW'
+    HEADER = struct.Struct('<4sBHqId')
+    CRC = struct.Struct('<I')
+    SYNC_INTERVAL = 0.5
+    RESET = 1                       # record flags
+    COPY = 2
+
+    def __init__(self, folder, sync_interval=None, submit=None):
+        if not path.exists(folder):
+            os.makedirs(folder)
+        self.folder = folder
+        self.fn = path.join(folder, WriteAheadLog.LOG_FN)
+        if sync_interval is None:
+            sync_interval = WriteAheadLog.SYNC_INTERVAL
+        self.sync_interval = sync_interval
+        self.submit = submit
+        self._lock = threading.Lock()
+        self._file = open(self.fn, mode='ab')
+        self.size = self._file.tell()
+        self._last_sync = time.monotonic()
+        self._sync_pending = False
+
+    # ====
+    # write records
+    # ====
+
+    def append(self, name, idx0, t, y, absolute_time, reset=False):
+        """appends record to log
+
+        Parameter
+        ---------
+        name : str
+            data line name
+        idx0 : int
+            index of first value counted from the last data reset
+        t, y : array-like
+            time and data values
+        absolute_time : float
+            absolute time to which time values refer
+        reset : bool
+            if True, the record replaces all previous values of the data line
+        
+        """
+        t = np.asarray(t, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        flags = WriteAheadLog.RESET if reset else 0
+        self._write_record(
+            flags, name, idx0, len(t), absolute_time, t.tobytes() + y.tobytes()
+        )
+
+    def append_copy(self, name, source_folder, n, absolute_time):
+        """appends record which replaces data line by the first n values of
+        the data line in another recording
+
+        Only the folder of the other recording is logged. The values are 
+        copied from it when the record is replayed.
+
+        Parameter
+        ---------
+        name : str
+            data line name
+        source_folder : str
+            folder of the recording from which the values are copied
+        n : int
+            number of copied values
+        absolute_time : float
+            absolute time to which time values refer
+
+        """
+        folder_bytes = path.abspath(source_folder).encode()
+        self._write_record(
+            WriteAheadLog.COPY, name, n, len(folder_bytes), absolute_time, 
+            folder_bytes
+        )
+
+    def _write_record(self, flags, name, idx0, n, absolute_time, payload):
+        name_bytes = name.encode()
+        record = b''.join([
+            WriteAheadLog.HEADER.pack(
+                WriteAheadLog.MAGIC, flags, len(name_bytes), idx0, n,
+                absolute_time
+            ),
+            name_bytes,
+            payload
+        ])
+        record += WriteAheadLog.CRC.pack(zlib.crc32(record))
+        with self._lock:
+            self._file.write(record)
+            self.size += len(record)
+        self._request_sync()
+
+    def _request_sync(self):
+        """schedules fsync call if last one is older than sync_interval"""
+        if self._sync_pending:
+            return
+        if time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        self._sync_pending = True
+        if self.submit is None:
+            self.sync()
+        else:
+            self.submit(self.sync)
+
+    def sync(self):
+        """flushes logged records and syncs the log file to disk"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            fileno = self._file.fileno()
+            os.fsync(fileno)
+        self._last_sync = time.monotonic()
+        self._sync_pending = False
+
+    def tell(self):
+        """returns log position. Used as argument for ``checkpoint()``"""
+        with self._lock:
+            return self.size
+
+    def checkpoint(self, position):
+        """removes all records before position from the log
+
+        Needs to be called after all values logged before position are 
+        written to the recording. Records after position are written to a 
+        temporary file which is synced to disk and replaces the log. The log
+        therefore contains these records at any time, also if the process 
+        crashes during the checkpoint.
+        """
+        with self._lock:
+            self._file.flush()
+            if position >= self.size:
+                self._file.truncate(0)
+                self._file.seek(0)
+                self.size = 0
+                return
+            with open(self.fn, mode='rb') as log_file:
+                log_file.seek(position)
+                tail = log_file.read()
+            tmp_fn = self.fn + '.tmp'
+            with open(tmp_fn, mode='wb') as tmp_file:
+                tmp_file.write(tail)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            self._file.close()
+            os.replace(tmp_fn, self.fn)
+            self._file = open(self.fn, mode='ab')
+            self.size = len(tail)
+
+    def close(self):
+        """syncs and closes the log file"""
+        self.sync()
+        with self._lock:
+            self._file.close()
+
+    # ====
+    # replay records
+    # ====
+
+    def read_records(self):
+        """returns list of all valid records in the log
+
+        Reading stops at the first incomplete or corrupted record.
+
+        Return
+        ------
+        list
+            list of tuples (name, reset, idx0, absolute_time, t, y, source).
+            source is the folder of the recording from which the first idx0
+            values are copied (see ``append_copy()``), None otherwise.
+        """
+        with self._lock:
+            self._file.flush()
+        with open(self.fn, mode='rb') as log_file:
+            data = log_file.read()
+
+        records = []
+        pos = 0
+        header_size = WriteAheadLog.HEADER.size
+        while pos + header_size <= len(data):
+            magic, flags, name_len, idx0, n, absolute_time = \
+                WriteAheadLog.HEADER.unpack_from(data, pos)
+            copy = bool(flags & WriteAheadLog.COPY)
+            end = pos + header_size + name_len + (n if copy else 16*n)
+            if magic != WriteAheadLog.MAGIC \
+                    or end + WriteAheadLog.CRC.size > len(data):
+                break
+            crc, = WriteAheadLog.CRC.unpack_from(data, end)
+            if crc != zlib.crc32(data[pos:end]):
+                break
+            pos_name = pos + header_size
+            pos_t = pos_name + name_len
+            pos_y = pos_t + 8*n
+            if copy:
+                t = y = np.empty(0)
+                source = data[pos_t:end].decode()
+            else:
+                t = np.frombuffer(data, dtype=np.float64, count=n, offset=pos_t)
+                y = np.frombuffer(data, dtype=np.float64, count=n, offset=pos_y)
+                source = None
+            records.append((
+                data[pos_name:pos_t].decode(),
+                copy or bool(flags & WriteAheadLog.RESET),
+                idx0,
+                absolute_time,
+                t,
+                y,
+                source
+            ))
+            pos = end + WriteAheadLog.CRC.size
+        return records
+
+    def replay(self, store=None):
+        """writes logged values which are missing in the recording to the 
+        recording and truncates the log afterwards. The log is kept if a data
+        line could not be restored completely (values missing between the
+        recording and the log, or the source of a copy record is not 
+        available) such that the next start can retry.
+
+        Parameter
+        ---------
+        store : DataStore
+            recording. Defaults to the recording in the log folder.
+
+        Return
+        ------
+        int
+            number of restored values
+
+        """
+        if store is None:
+            store = DataStore(self.folder)
+        lines = {}
+        for name, reset, idx0, absolute_time, t, y, source in \
+                self.read_records():
+            if name not in lines or reset:
+                lines[name] = {
+                    'n':        0 if reset else store.get_length(name),
+                    'reset':    reset,
+                    'source':   source,
+                    'complete': True,
+                    't':        [],
+                    'y':        [],
+                }
+                if source is not None:
+                    lines[name]['n'] = lines[name]['n_copy'] = idx0
+            line = lines[name]
+            if not line['complete']:
+                continue
+            line['absolute_time'] = absolute_time
+            n_skip = line['n'] - idx0
+            if n_skip < 0:
+                print('WriteAheadLog: values missing in {}: {} to {}'.format(
+                    name, line['n'], idx0
+                ))
+                line['complete'] = False
+                continue
+            if n_skip >= len(t):
+                continue
+            line['t'].append(t[n_skip:])
+            line['y'].append(y[n_skip:])
+            line['n'] = idx0 + len(t)
+
+        n_restored = 0
+        for name, line in lines.items():
+            if not line['reset'] and len(line['t']) == 0:
+                continue
+            t = np.concatenate(line['t'] + [np.empty(0)])
+            y = np.concatenate(line['y'] + [np.empty(0)])
+            if line['source'] is not None:
+                if not self._restore_copy(store, name, line):
+                    line['complete'] = False
+                    continue
+                n_restored += line['n_copy']
+                if len(t) > 0:
+                    store.append(name, t, y, line['absolute_time'])
+            elif line['reset']:
+                store.write(name, t, y, line['absolute_time'])
+            else:
+                store.append(name, t, y, line['absolute_time'])
+            n_restored += len(t)
+        if all(line['complete'] for line in lines.values()):
+            self.checkpoint(self.tell())
+        else:
+            print('WriteAheadLog: log kept in {}'.format(self.folder))
+        return n_restored
+
+    def _restore_copy(self, store, name, line):
+        """copies data line from the recording referenced in a copy record.
+        Returns False if the recording is not available anymore."""
+        source_index = path.join(line['source'], DataStore.INDEX_FN)
+        try:
+            if not path.exists(source_index):
+                raise DataStoreException(
+                    'recording not found: {}'.format(line['source'])
+                )
+            store.copy(DataStore(line['source']), name, line['n_copy'])
+        except (DataStoreException, OSError) as e:
+            print('WriteAheadLog: {} cannot be restored: {}'.format(name, e))
+            return False
+        return True
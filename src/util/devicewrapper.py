@@ -7,9 +7,17 @@ DeviceWrapper creates a thread in which calls to the wrapped device are cued to
 handle hardware calls from different objects as it is the case in gui 
 applications
 
+Every call is handed to the thread together with its own 
+concurrent.futures.Future which is resolved by the thread with the return 
+value or the raised exception. Blocking callers wait on their future and wake
+up as soon as the call is done. Callers from different threads do not share
+any state on the DeviceWrapper object. Calls which are not run because the
+thread was stopped before fail with DeviceWrapperException.
 
 """
 
+import concurrent.futures
+import functools
 import queue
 import os
 import threading
@@ -44,6 +52,9 @@ class DeviceWrapper():
         >>> dw = DeviceWrapper(d)
         >>> dw.some_function()
         5
+        >>> future = dw.submit('some_function')
+        >>> future.result()
+        5
         
         
     """
@@ -55,16 +66,21 @@ class DeviceWrapper():
     def __getattr__(self, name):
         """redirects method and attribute calls to device object
         
+        Methods are called in the workerthread if the thread is running. 
+        Attributes are returned directly.
         
         """
+        if name in ('d', 'wt'):
+            # not yet set in __init__
+            raise AttributeError(name)
         if hasattr(self.d, name):
-            if self.thread_is_alive():
-                self.func_name = getattr(self.d, name)
-                return self._send_worker_task
+            attr = getattr(self.d, name)
+            if callable(attr) and self.thread_is_alive():
+                return functools.partial(self._call, attr)
             else:
-                return getattr(self.d, name)
+                return attr
         else:
-            raise AttributeError
+            raise AttributeError(name)
         
     def _create_worker_thread(self):
         """initialzes the workerthread """
@@ -88,31 +104,68 @@ class DeviceWrapper():
     def thread_is_alive(self):
         return self.wt.is_alive()
         
-    def _send_worker_task(self, *args, **kwargs):
-        w = WorkerTaskBase(
-            func=self.func_name, 
-            args=args, 
-            kwargs=kwargs,
-            callback=self._callback
-        )
-        self.wt.put(w)
-        self.wait_for_callback = True
-        
-        while self.wait_for_callback:
-            time.sleep(0.1)
-        return self.rtn
+    def submit(self, name, *args, **kwargs):
+        """calls device function in workerthread and returns immediately
         
-            
-    def _callback(self, return_args):
-        """helper function to retrieve return value from WorkTask object
+        Parameter
+        ---------
+        name : str
+            name of the device function
+        args, kwargs
+            arguments of the device function call
         
-        This function is part of the callback mechanism to retrieve the return
-        value from the WorkerTask object function call initiated by the _
-        send_worker_task function
+        Return
+        ------
+        future : concurrent.futures.Future
+            resolved with the return value of the device function call
         
         """
-        self.rtn = return_args
-        self.wait_for_callback = False
+        if not self.thread_is_alive():
+            raise DeviceWrapperException('Thread is not running.')
+        return self._submit(getattr(self.d, name), *args, **kwargs)
+    
+    def _submit(self, func, *args, **kwargs):
+        future = concurrent.futures.Future()
+        self.wt.put(DeviceCallTask(
+            func=self._resolve, 
+            args=(future, func, args, kwargs)
+        ))
+        return future
+    
+    def _call(self, func, *args, **kwargs):
+        """calls func in workerthread and waits for the return value"""
+        if threading.current_thread() is self.wt:
+            # waiting for the own thread would block forever
+            return func(*args, **kwargs)
+        return self._submit(func, *args, **kwargs).result()
+        
+    @staticmethod
+    def _resolve(future, func, args, kwargs):
+        """runs func in workerthread and resolves future with its return 
+        value or exception"""
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            rtn = func(*args, **kwargs)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(rtn)
+
+
+class DeviceCallTask(WorkerTaskBase):
+    """WorkerTask of a device call whose future (first argument) fails if
+    the thread ends before running the call"""
+
+    def cancel(self):
+        future = self.args[0]
+        try:
+            future.set_exception(DeviceWrapperException(
+                'Thread stopped before the call was run.'
+            ))
+        except concurrent.futures.InvalidStateError:
+            # future was resolved or cancelled already
+            pass
 
 
 # ===========================================================================
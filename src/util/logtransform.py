@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LogTransform class provides the log10 values of a DataBuffer for log mode.
+
+The log values are computed once per value: when values are appended to the
+buffer, only the new values are transformed and stored behind the values
+transformed before. Switching the log mode on and off therefore does not
+recompute the logarithm of the whole data line.
+
+Values <= 0 have no logarithm. ``safe_log10()`` maps them to NaN, which is
+plotted as gap in the data line and is ignored when bounds are computed.
+
+
+Example::
+    >>> buf = DataBuffer()
+    >>> log = LogTransform(buf)
+    >>> buf.extend(t, y)
+    >>> log_t, log_y = log.get_data()
+
+"""
+
+import numpy as np
+
+
+
+def safe_log10(values):
+    """returns log10 of values with NaN for values <= 0"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    np.log10(values, out=out, where=values > 0)
+    return out
+
+
+class LogTransform():
+    """Incrementally extended log10 values of a DataBuffer
+
+    Log values are stored in growable arrays. Values are indexed by their
+    position counted from the last buffer reset, which keeps the transform
+    valid when values are evicted from the front of the buffer.
+
+
+    Parameter
+    ---------
+    buffer : DataBuffer
+        buffer containing the data line values
+
+    Note:
+        ``reset()`` needs to be called whenever the buffer is cleared or its
+        data are replaced.
+
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self._t = np.empty(LogTransform.INITIAL_CAPACITY)
+        self._y = np.empty(LogTransform.INITIAL_CAPACITY)
+        self.reset()
+
+    def reset(self):
+        """removes all log values"""
+        self._first = 0         # index of value at array position 0
+        self._n = 0             # number of log values
+
+    def update(self):
+        """transforms all values which were appended since the last update"""
+        t, y = self.buffer.get_data()
+        start = self.buffer.n_evicted
+        end = start + len(t)
+        if self._first + self._n < start:
+            # values of missing log values were evicted already
+            self.reset()
+            self._first = start
+        n_new = end - (self._first + self._n)
+        if n_new <= 0:
+            return
+        n_keep = self._first + self._n - start
+        if self._n + n_new > len(self._t):
+            # drop log values of evicted values and grow if necessary
+            capacity = len(self._t)
+            while capacity < n_keep + n_new:
+                capacity *= 2
+            n_drop = start - self._first
+            for attr in ('_t', '_y'):
+                old = getattr(self, attr)
+                new = old if capacity == len(old) else np.empty(capacity)
+                new[:n_keep] = old[n_drop:n_drop+n_keep]
+                setattr(self, attr, new)
+            self._first = start
+            self._n = n_keep
+        self._t[self._n:self._n+n_new] = safe_log10(t[len(t)-n_new:])
+        self._y[self._n:self._n+n_new] = safe_log10(y[len(y)-n_new:])
+        self._n += n_new
+
+    def get_data(self):
+        """updates the transform and returns views of the log10 time and
+        data values of the values present in the buffer"""
+        self.update()
+        idx0 = self.buffer.n_evicted - self._first
+        return self._t[idx0:self._n], self._y[idx0:self._n]
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MinMaxPyramid class provides level-of-detail data for plotting long data lines.
+
+The pyramid keeps the minimum and maximum value of consecutive blocks of a
+DataBuffer on several levels. Level 0 summarizes blocks of block_size values,
+every higher level summarizes factor blocks of the level below. To plot a
+data line, the level whose block size matches the number of values per pixel
+is selected. The plotted line then consists of a min/max pair per block such
+that the plotting cost scales with the number of pixels instead of the number
+of values while peaks remain visible.
+
+The pyramid is updated incrementally: only blocks which were completed since
+the last update are computed. Blocks are indexed by the position of their
+values counted from the last buffer reset, which keeps the pyramid valid when
+values are evicted from the front of the buffer.
+
+The pyramid also provides the data bounds used for autoranging. Bounds of 
+all values are tracked as running minimum and maximum. Bounds of a time range
+(or of all values after values were evicted) are combined from the largest
+blocks within the range, i.e. without scanning the values.
+
+
+Example::
+    >>> buf = DataBuffer()
+    >>> lod = MinMaxPyramid(buf)
+    >>> buf.extend(t, y)
+    >>> x, y = lod.get_data(tmin=0., tmax=10., width=800)
+    >>> ymin, ymax = lod.get_bounds(tmin=0., tmax=10.)
+
+"""
+
+import numpy as np
+
+try:
+    from .databuffer import get_range_indices
+except:
+    from databuffer import get_range_indices
+
+
+
+class MinMaxPyramidException(Exception):
+    pass
+
+
+class _PyramidLevel():
+    """min/max values of consecutive blocks with fixed size
+
+    Blocks are stored in growable arrays. first is the index of the block
+    stored at array position 0, counted from the last buffer reset.
+    """
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, block_size):
+        self.block_size = block_size
+        self.first = 0
+        self.n = 0
+        self.t = np.empty(_PyramidLevel.INITIAL_CAPACITY, dtype=np.float64)
+        self.ymin = np.empty(_PyramidLevel.INITIAL_CAPACITY, dtype=np.float64)
+        self.ymax = np.empty(_PyramidLevel.INITIAL_CAPACITY, dtype=np.float64)
+
+    @property
+    def end(self):
+        """index of the next block which is not computed yet"""
+        return self.first + self.n
+
+    def reset(self, first=0):
+        self.first = first
+        self.n = 0
+
+    def extend(self, t, ymin, ymax, keep_from=0):
+        """appends blocks. Blocks before keep_from may be dropped to make
+        space."""
+        n = len(t)
+        if self.n + n > len(self.t):
+            n_drop = min(max(0, keep_from - self.first), self.n)
+            n_keep = self.n - n_drop
+            capacity = len(self.t)
+            while capacity < n_keep + n:
+                capacity *= 2
+            for attr in ('t', 'ymin', 'ymax'):
+                old = getattr(self, attr)
+                new = old if capacity == len(old) else np.empty(capacity)
+                new[:n_keep] = old[n_drop:self.n]
+                setattr(self, attr, new)
+            self.first += n_drop
+            self.n = n_keep
+        self.t[self.n:self.n+n] = t
+        self.ymin[self.n:self.n+n] = ymin
+        self.ymax[self.n:self.n+n] = ymax
+        self.n += n
+
+    def get_blocks(self, start, stop):
+        """returns time, min, and max values of blocks start to stop"""
+        idx0, idx1 = start - self.first, stop - self.first
+        return self.t[idx0:idx1], self.ymin[idx0:idx1], self.ymax[idx0:idx1]
+
+
+class MinMaxPyramid():
+    """Incrementally updated multi-resolution min/max summary of a DataBuffer
+
+    Parameter
+    ---------
+    buffer : DataBuffer
+        buffer containing the data line values. Time values need to be
+        increasing.
+    block_size : int
+        number of values summarized by one block of level 0
+    factor : int
+        number of blocks of a level summarized by one block of the next level
+    n_levels : int
+        number of levels
+
+    Note:
+        ``reset()`` needs to be called whenever the buffer is cleared or its
+        data are replaced.
+
+    """
+
+    BLOCK_SIZE = 64
+    FACTOR = 4
+    N_LEVELS = 10
+
+    def __init__(self, buffer, block_size=None, factor=None, n_levels=None):
+        self.buffer = buffer
+        self.block_size = block_size or MinMaxPyramid.BLOCK_SIZE
+        self.factor = factor or MinMaxPyramid.FACTOR
+        n_levels = n_levels or MinMaxPyramid.N_LEVELS
+        if self.block_size < 2 or self.factor < 2:
+            raise MinMaxPyramidException(
+                'block_size and factor need to be larger than 1: {}, {}'.format(
+                    self.block_size, self.factor
+                )
+            )
+        self.levels = [
+            _PyramidLevel(self.block_size * self.factor**k)
+            for k in range(n_levels)
+        ]
+        self.reset()
+
+    def reset(self):
+        """removes all blocks"""
+        for level in self.levels:
+            level.reset()
+        self._running = [0, np.inf, -np.inf]    # n values, ymin, ymax
+
+    # ====
+    # update
+    # ====
+
+    def update(self):
+        """computes all blocks which were completed since the last update"""
+        t, y = self.buffer.get_data()
+        start = self.buffer.n_evicted
+        end = start + len(t)
+
+        # level 0 from buffer values
+        level = self.levels[0]
+        bs = level.block_size
+        if level.end*bs < start:
+            # values of missing blocks were evicted already
+            level.reset(-(-start // bs))
+        n_new = end//bs - level.end
+        if n_new > 0:
+            idx0 = level.end*bs - start
+            y_ = np.asarray(y[idx0:idx0 + n_new*bs]).reshape(n_new, bs)
+            level.extend(
+                t[idx0:idx0 + n_new*bs:bs],
+                np.fmin.reduce(y_, axis=1),
+                np.fmax.reduce(y_, axis=1),
+                keep_from=start//bs
+            )
+
+        # higher levels from the level below
+        for lower, level in zip(self.levels[:-1], self.levels[1:]):
+            f = self.factor
+            if level.end*f < lower.first:
+                level.reset(-(-lower.first // f))
+            n_new = lower.end//f - level.end
+            if n_new <= 0:
+                continue
+            t_, ymin, ymax = lower.get_blocks(level.end*f, (level.end+n_new)*f)
+            level.extend(
+                t_[::f],
+                np.fmin.reduce(ymin.reshape(n_new, f), axis=1),
+                np.fmax.reduce(ymax.reshape(n_new, f), axis=1),
+                keep_from=start//level.block_size
+            )
+
+    # ====
+    # query
+    # ====
+
+    def select_level(self, n_values, width):
+        """returns level with the largest block size that still provides at
+        least width blocks for n_values. Returns None if n_values can be
+        plotted without reduction."""
+        selected = None
+        for level in self.levels:
+            if level.block_size * width > n_values:
+                break
+            selected = level
+        return selected
+
+    def is_reduced(self, width):
+        """returns True if the data line is too long to be plotted without 
+        reduction in width pixels. Only then ``get_data()`` depends on the 
+        time range."""
+        if width is None or width <= 0:
+            return False
+        return self.select_level(len(self.buffer), width) is not None
+
+    def get_data(self, tmin=None, tmax=None, width=None):
+        """returns reduced time and data arrays for plotting
+
+        Values between tmin and tmax are reduced to about width to
+        factor*width min/max pairs. Every pair is plotted at the time of the
+        first value of its block with the maximum value first (same as the
+        'peak' downsampling method of pyqtgraph). Incomplete blocks at both
+        ends of the range are reduced from the raw values. 
+
+        Data lines which do not need to be reduced as a whole are returned 
+        completely, i.e. they are not cut to the time range. Their plot 
+        therefore stays valid when the range changes.
+
+        Parameter
+        ---------
+        tmin, tmax : float
+            time range. None means unbounded.
+        width : int
+            number of pixels available for the range. None disables the
+            reduction.
+
+        Return
+        ------
+        tuple
+            time and data arrays. Raw views are returned if no reduction is
+            necessary.
+
+        """
+        t, y = self.buffer.get_data()
+        if not self.is_reduced(width):
+            return t, y
+        idx0, idx1 = get_range_indices(t, tmin, tmax)
+        # include neighbouring values to draw line segments leaving the range
+        idx0, idx1 = max(0, idx0-1), min(len(t), idx1+1)
+
+        level = self.select_level(idx1 - idx0, width)
+        if level is None:
+            return t[idx0:idx1], y[idx0:idx1]
+
+        self.update()
+        start = self.buffer.n_evicted
+        bs = level.block_size
+        block0 = max(level.first, -(-(start + idx0) // bs))
+        block1 = min(level.end, (start + idx1) // bs)
+        if block1 <= block0:
+            return t[idx0:idx1], y[idx0:idx1]
+
+        x_parts, y_parts = [], []
+        head = slice(idx0, block0*bs - start)
+        tail = slice(block1*bs - start, idx1)
+        self._add_raw_pair(x_parts, y_parts, t[head], y[head])
+        t_, ymin, ymax = level.get_blocks(block0, block1)
+        x_parts.append(np.repeat(t_, 2))
+        y_parts.append(np.column_stack([ymax, ymin]).ravel())
+        self._add_raw_pair(x_parts, y_parts, t[tail], y[tail])
+        return np.concatenate(x_parts), np.concatenate(y_parts)
+
+    def get_bounds(self, tmin=None, tmax=None):
+        """returns minimum and maximum data value with tmin <= t <= tmax
+
+        Without time range and as long as no values were evicted, running 
+        bounds are updated with the values appended since the last call. 
+        Otherwise, the bounds are combined from the largest pyramid blocks 
+        within the range and the values at both ends of the range which are 
+        not covered by complete blocks. NaN values are ignored.
+
+        Parameter
+        ---------
+        tmin, tmax : float
+            time range. None means unbounded.
+
+        Return
+        ------
+        tuple
+            (ymin, ymax) or None if there are no values in the range
+
+        """
+        t, y = self.buffer.get_data()
+        start = self.buffer.n_evicted
+        if tmin is None and tmax is None and start == 0:
+            n, ymin, ymax = self._running
+            if len(y) > n:
+                ymin = np.fmin(ymin, np.fmin.reduce(y[n:]))
+                ymax = np.fmax(ymax, np.fmax.reduce(y[n:]))
+                self._running = [len(y), ymin, ymax]
+            if len(y) == 0:
+                return None
+            return ymin, ymax
+
+        idx0, idx1 = get_range_indices(t, tmin, tmax)
+        if idx1 <= idx0:
+            return None
+        self.update()
+        ymin, ymax = np.inf, -np.inf
+        parts = [(start + idx0, start + idx1)]
+        for level in reversed(self.levels):
+            bs = level.block_size
+            remaining = []
+            for g0, g1 in parts:
+                block0 = max(level.first, -(-g0 // bs))
+                block1 = min(level.end, g1 // bs)
+                if block1 <= block0:
+                    remaining.append((g0, g1))
+                    continue
+                _, bmin, bmax = level.get_blocks(block0, block1)
+                ymin = np.fmin(ymin, np.fmin.reduce(bmin))
+                ymax = np.fmax(ymax, np.fmax.reduce(bmax))
+                if g0 < block0*bs:
+                    remaining.append((g0, block0*bs))
+                if block1*bs < g1:
+                    remaining.append((block1*bs, g1))
+            parts = remaining
+        for g0, g1 in parts:
+            y_ = y[g0-start:g1-start]
+            ymin = np.fmin(ymin, np.fmin.reduce(y_))
+            ymax = np.fmax(ymax, np.fmax.reduce(y_))
+        return ymin, ymax
+
+    def _add_raw_pair(self, x_parts, y_parts, t, y):
+        """appends min/max pair of raw values if there are any"""
+        if len(t) == 0:
+            return
+        x_parts.append(np.array([t[0], t[0]]))
+        y_parts.append(np.array([np.max(y), np.min(y)]))
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SampleQueue class hands samples from a device thread to the GUI thread.
+
+The queue is a bounded ring buffer for exactly one producer (the device
+thread) and one consumer (the GUI thread). The producer only advances the
+write position and the consumer only advances the read position, so neither
+side takes a lock or waits for the other side in normal operation. The
+consumer drains all samples that arrived since the last drain as numpy
+arrays.
+
+If the consumer falls behind and the ring buffer runs full, the overflow
+policy decides what happens with new samples:
+
+* 'block': the producer waits until the consumer made space
+* 'drop_oldest': the oldest samples are overwritten
+* 'spill': samples are written to a temporary file on disk and are drained
+  after the samples in the ring buffer
+
+Dropped, spilled, and blocked samples are counted (see ``get_metrics()``).
+
+
+Example::
+    >>> q = SampleQueue(capacity=1024)
+    >>> q.put(time.time(), 5.)          # device thread
+    >>> t, y = q.drain()                # GUI thread
+
+"""
+
+import tempfile
+import threading
+
+import numpy as np
+
+
+
+class SampleQueueException(Exception):
+    pass
+
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'spill')
+
+
+class SampleQueue():
+    """Bounded single-producer single-consumer queue of (time, value) pairs
+
+    Parameter
+    ---------
+    capacity : int
+        number of samples in the ring buffer
+    overflow : str
+        behavior if the ring buffer is full. One of OVERFLOW_POLICIES.
+    spill_dir : str
+        folder of the temporary spill file. None uses the system default.
+
+    """
+
+    CAPACITY = 2**16
+    BLOCK_TIMEOUT = 0.1             # s between checks while blocked
+
+    def __init__(self, capacity=None, overflow='block', spill_dir=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise SampleQueueException(
+                'unknown overflow policy: {}'.format(overflow)
+            )
+        self.capacity = int(capacity or SampleQueue.CAPACITY)
+        self.overflow = overflow
+        self.spill_dir = spill_dir
+        self._t = np.empty(self.capacity)
+        self._y = np.empty(self.capacity)
+        self._head = 0              # samples read, advanced by consumer
+        self._tail = 0              # samples written, advanced by producer
+        self._writing = 0           # samples of which writing has started
+        self._space = threading.Event()
+        self._closed = False
+        self._spill_lock = threading.Lock()
+        self._spill_file = None
+        self._spilling = False
+        self._metrics = {
+            'put': 0,
+            'drained': 0,
+            'dropped': 0,
+            'spilled': 0,
+            'blocked': 0,
+            'max_fill': 0,
+        }
+
+    def __len__(self):
+        return min(self._tail - self._head, self.capacity)
+
+    # ====
+    # producer
+    # ====
+
+    def put(self, t, y):
+        """adds sample to queue. Must only be called from the producer
+        thread."""
+        self._metrics['put'] += 1
+        if self._spilling:
+            self._spill(t, y)
+            return
+        fill = self._tail - self._head
+        if fill >= self.capacity:
+            if self.overflow == 'block':
+                self._wait_for_space()
+            elif self.overflow == 'spill':
+                self._spill(t, y)
+                return
+        idx = self._tail % self.capacity
+        # the consumer counts the slot as overwritten from here on
+        self._writing = self._tail + 1
+        self._t[idx] = t
+        self._y[idx] = y
+        # sample is visible to the consumer after the position is advanced
+        self._tail += 1
+        self._metrics['max_fill'] = max(self._metrics['max_fill'], len(self))
+
+    def _wait_for_space(self):
+        self._metrics['blocked'] += 1
+        while self._tail - self._head >= self.capacity and not self._closed:
+            self._space.clear()
+            if self._tail - self._head < self.capacity:
+                break
+            self._space.wait(SampleQueue.BLOCK_TIMEOUT)
+
+    def _spill(self, t, y):
+        with self._spill_lock:
+            if self._spill_file is None:
+                self._spill_file = tempfile.TemporaryFile(dir=self.spill_dir)
+            sample = np.array([t, y], dtype=np.float64)
+            self._spill_file.write(sample.tobytes())
+            self._spilling = True
+            self._metrics['spilled'] += 1
+
+    def close(self):
+        """releases a blocked producer. Samples put afterwards are dropped
+        if the queue is full."""
+        self._closed = True
+        self._space.set()
+
+    # ====
+    # consumer
+    # ====
+
+    def drain(self):
+        """returns time and value arrays of all samples which arrived since
+        the last call. Must only be called from the consumer thread."""
+        t, y = self._drain_ring()
+        if self._spilling:
+            with self._spill_lock:
+                # samples which were put into the ring buffer after the first
+                #   call, but before the producer switched into spill mode
+                t_ring, y_ring = self._drain_ring()
+                t_spill, y_spill = self._drain_spill()
+            t = np.concatenate([t, t_ring, t_spill])
+            y = np.concatenate([y, y_ring, y_spill])
+        self._metrics['drained'] += len(t)
+        return t, y
+
+    def _drain_ring(self):
+        """returns samples from the ring buffer and advances read position"""
+        head = self._head
+        tail = self._tail
+        if tail - head > self.capacity:
+            # overwritten by producer (drop_oldest or closed queue)
+            self._metrics['dropped'] += tail - self.capacity - head
+            head = tail - self.capacity
+        t, y = self._copy_range(head, tail)
+        if self.overflow == 'drop_oldest' or self._closed:
+            # samples overwritten while copying (including a slot which is
+            #   being written right now) are dropped
+            n_lost = min(self._writing - self.capacity - head, len(t))
+            if n_lost > 0:
+                self._metrics['dropped'] += n_lost
+                t, y = t[n_lost:], y[n_lost:]
+        self._head = tail
+        self._space.set()
+        return t, y
+
+    def _copy_range(self, start, stop):
+        idx0 = start % self.capacity
+        idx1 = idx0 + (stop - start)
+        if idx1 <= self.capacity:
+            return self._t[idx0:idx1].copy(), self._y[idx0:idx1].copy()
+        idx1 -= self.capacity
+        return (
+            np.concatenate([self._t[idx0:], self._t[:idx1]]),
+            np.concatenate([self._y[idx0:], self._y[:idx1]])
+        )
+
+    def _drain_spill(self):
+        """returns spilled samples and switches producer back to the ring
+        buffer. Must be called with the spill lock held."""
+        self._spill_file.seek(0)
+        data = np.frombuffer(self._spill_file.read(), dtype=np.float64)
+        self._spill_file.seek(0)
+        self._spill_file.truncate()
+        self._spilling = False
+        data = data.reshape(-1, 2)
+        return data[:,0].copy(), data[:,1].copy()
+
+    def get_metrics(self):
+        """returns counters of queued, drained, dropped, spilled, and
+        blocked samples"""
+        metrics = dict(self._metrics)
+        metrics['fill'] = len(self)
+        return metrics
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Spectrum estimation for live data lines.
+
+``welch()`` estimates the amplitude spectrum of a data line by averaging the
+power spectra of overlapping, windowed segments (Welch's method).
+
+WelchSpectrum class applies the same method to the values of a DataBuffer
+while they arrive. Only segments which were completed since the last update
+are transformed and the spectrum is averaged over a sliding window of the
+most recent segments. Every new segment therefore costs
+O(segment_len log segment_len) independent of the history length and the
+spectrum follows changes of the signal.
+
+Amplitudes are normalized by the sum of the window values, i.e. they have
+the same scale as the amplitudes of ``pg.PlotDataItem._fourierTransform``.
+
+FFTs require uniformly spaced time values. ``resample_uniform()`` maps
+values with jittery or gapped time stamps onto a uniform grid by linear
+interpolation or, if several values fall into one grid interval, by 
+averaging the values of every interval. WelchSpectrum resamples every 
+segment whose time values are not uniformly spaced onto a uniform grid with
+segment_len points.
+
+Spectrogram class keeps the spectra of the most recent segments as columns of
+a fixed-size image which shows how the spectrum changes over time.
+
+
+Example::
+    >>> buf = DataBuffer()
+    >>> spectrum = WelchSpectrum(buf, segment_len=256)
+    >>> buf.extend(t, y)
+    >>> f, a = spectrum.get_spectrum()
+
+"""
+
+import numpy as np
+
+
+
+class SpectrumException(Exception):
+    pass
+
+
+WINDOWS = (None, 'hanning', 'hamming', 'blackman', 'bartlett')
+RESAMPLE_METHODS = ('auto', 'linear', 'mean')
+UNIFORM_TOLERANCE = 1e-3        # relative spacing deviation seen as uniform
+MAX_GRID_FACTOR = 4             # maximum ratio of grid points to values
+
+
+def is_uniform(t):
+    """returns True if time values are uniformly spaced"""
+    if len(t) < 3:
+        return True
+    dt = np.diff(t)
+    return not np.any(np.abs(dt - dt[0]) > abs(dt[0])*UNIFORM_TOLERANCE)
+
+
+def _nonuniform_rows(t):
+    """returns mask of the rows of t whose values are not uniformly spaced"""
+    dt = np.diff(t, axis=1)
+    return np.any(
+        np.abs(dt - dt[:,:1]) > np.abs(dt[:,:1])*UNIFORM_TOLERANCE, axis=1
+    )
+
+
+def resample_uniform(t, y, n=None, method='auto'):
+    """returns time and data values resampled on a uniform time grid
+
+    The grid covers the range of t. Its default spacing is the median
+    spacing of t such that jitter does not reduce the time resolution and
+    pauses in the acquisition do not lower the sample rate of the grid. The
+    number of grid points is limited to MAX_GRID_FACTOR times the number of 
+    values. Uniformly spaced values are returned unchanged.
+
+    Parameter
+    ---------
+    t, y : ndarray
+        time and data values. t needs to be increasing.
+    n : int
+        number of grid points. None derives it from the median spacing.
+    method : str
+        'linear' interpolates values at the grid points. 'mean' averages all
+        values within the interval around every grid point and interpolates 
+        intervals without values. 'auto' uses 'mean' if there are at least 
+        two values per grid interval on average and 'linear' otherwise.
+
+    Return
+    ------
+    tuple
+        time and data arrays on uniform grid
+
+    """
+    if method not in RESAMPLE_METHODS:
+        raise SpectrumException('unknown resample method: {}'.format(method))
+    if len(t) < 3 or (n is None and is_uniform(t)):
+        return t, y
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    span = t[-1] - t[0]
+    if n is None:
+        dt = np.median(np.diff(t))
+        n = len(t) if dt <= 0 else int(round(span/dt)) + 1
+        n = min(n, MAX_GRID_FACTOR*len(t))
+    n = max(2, int(n))
+    grid = np.linspace(t[0], t[-1], n)
+    if method == 'auto':
+        method = 'mean' if len(t) >= 2*n else 'linear'
+
+    if method == 'linear':
+        return grid, np.interp(grid, t, y)
+
+    bins = np.rint((t - t[0]) * ((n-1)/span)).astype(np.intp)
+    np.clip(bins, 0, n-1, out=bins)
+    counts = np.bincount(bins, minlength=n)
+    sums = np.bincount(bins, weights=y, minlength=n)
+    filled = counts > 0
+    y_grid = np.empty(n)
+    y_grid[filled] = sums[filled] / counts[filled]
+    if not np.all(filled):
+        y_grid[~filled] = np.interp(
+            grid[~filled], grid[filled], y_grid[filled]
+        )
+    return grid, y_grid
+
+
+def get_window(window, n):
+    """returns window function values of length n
+
+    Parameter
+    ---------
+    window : str
+        one of WINDOWS. None returns a rectangular window.
+    n : int
+        number of values
+
+    """
+    if window not in WINDOWS:
+        raise SpectrumException('unknown window: {}'.format(window))
+    if window is None:
+        return np.ones(n)
+    return getattr(np, window)(n)
+
+
+def _get_hop(segment_len, overlap):
+    if not 0 <= overlap < 1:
+        raise SpectrumException(
+            'overlap needs to be in range [0,1): {}'.format(overlap)
+        )
+    return max(1, int(round(segment_len*(1-overlap))))
+
+
+def _segment_power(segments, window):
+    """returns power spectra of the rows of segments"""
+    f = np.fft.rfft(segments*window, axis=1) / window.sum()
+    return np.abs(f)**2
+
+
+def welch(t, y, segment_len=256, overlap=0.5, window='hanning'):
+    """returns amplitude spectrum averaged over overlapping segments
+
+    Time values are expected to be (approximately) uniformly spaced. If there
+    are less values than segment_len, a single segment containing all values
+    is used.
+
+    Parameter
+    ---------
+    t, y : ndarray
+        time and data values
+    segment_len : int
+        number of values per segment
+    overlap : float
+        fraction by which consecutive segments overlap
+    window : str
+        window function applied to every segment. See WINDOWS.
+
+    Return
+    ------
+    tuple
+        frequency and amplitude arrays
+
+    """
+    n = len(y)
+    if n < 2:
+        return np.zeros(0), np.zeros(0)
+    segment_len = min(int(segment_len), n)
+    hop = _get_hop(segment_len, overlap)
+    segments = np.lib.stride_tricks.sliding_window_view(
+        np.asarray(y, dtype=np.float64), segment_len
+    )[::hop]
+    power = _segment_power(segments, get_window(window, segment_len))
+    dt = float(t[-1] - t[0]) / (n-1)
+    freq = np.fft.rfftfreq(segment_len, dt)
+    return freq, np.sqrt(power.mean(axis=0))
+
+
+class WelchSpectrum():
+    """Streaming Welch spectrum of the values in a DataBuffer
+
+    The spectrum is averaged over the n_average most recent segments. Power
+    spectra of the segments are kept in a ring buffer such that old segments
+    drop out of the average when new ones arrive. Segments with non-uniform 
+    time values are resampled by linear interpolation before they are 
+    transformed. Segments are indexed by the
+    position of their values counted from the last buffer reset, which keeps
+    the estimator valid when values are evicted from the buffer.
+
+
+    Parameter
+    ---------
+    buffer : DataBuffer
+        buffer containing the data line values
+    segment_len : int
+        number of values per segment
+    overlap : float
+        fraction by which consecutive segments overlap
+    window : str
+        window function applied to every segment. See WINDOWS.
+    n_average : int
+        number of segments averaged
+
+    Note:
+        ``reset()`` needs to be called whenever the buffer is cleared or its
+        data are replaced.
+
+    """
+
+    SEGMENT_LEN = 256
+    OVERLAP = 0.5
+    WINDOW = 'hanning'
+    N_AVERAGE = 16
+
+    def __init__(self, buffer, segment_len=None, overlap=None,
+                 window=None, n_average=None):
+        self.buffer = buffer
+        self.set_params(
+            segment_len=segment_len or WelchSpectrum.SEGMENT_LEN,
+            overlap=WelchSpectrum.OVERLAP if overlap is None else overlap,
+            window=window or WelchSpectrum.WINDOW,
+            n_average=n_average or WelchSpectrum.N_AVERAGE
+        )
+
+    def set_params(self, segment_len=None, overlap=None, window=None,
+                   n_average=None):
+        """changes estimator parameters and restarts averaging with the
+        values present in the buffer"""
+        if segment_len is not None:
+            if int(segment_len) < 2:
+                raise SpectrumException(
+                    'segment_len needs to be larger than 1: {}'.format(
+                        segment_len
+                    )
+                )
+            self.segment_len = int(segment_len)
+        if overlap is not None:
+            self.overlap = overlap
+        if window is not None:
+            get_window(window, 1)
+            self.window = window
+        if n_average is not None:
+            self.n_average = max(1, int(n_average))
+        self.hop = _get_hop(self.segment_len, self.overlap)
+        self._window = get_window(self.window, self.segment_len)
+        self.reset()
+
+    @property
+    def n_segments(self):
+        """number of segments transformed since the last reset"""
+        return self._count
+
+    def reset(self):
+        """removes all segments from the average"""
+        n_freq = self.segment_len//2 + 1
+        self._power = np.zeros((self.n_average, n_freq))
+        self._dt = np.zeros(self.n_average)
+        self._t0 = np.zeros(self.n_average)
+        self._count = 0         # number of segments computed since reset
+        self._next = 0          # start index of next segment
+
+    def update(self):
+        """transforms all segments which were completed since the last
+        update and returns their number"""
+        t, y = self.buffer.get_data()
+        start = self.buffer.n_evicted
+        end = start + len(t)
+        if self._next < start:
+            # values of missing segments were evicted already
+            self._next += -(-(start - self._next) // self.hop) * self.hop
+        n_new = (end - self.segment_len - self._next) // self.hop + 1
+        if n_new <= 0:
+            return 0
+        # older segments would drop out of the average immediately
+        n_skip = max(0, n_new - self.n_average)
+        first = self._next + n_skip*self.hop - start
+        n_calc = n_new - n_skip
+        stop = first + (n_calc-1)*self.hop + self.segment_len
+        segments = np.lib.stride_tricks.sliding_window_view(
+            np.asarray(y[first:stop], dtype=np.float64), self.segment_len
+        )[::self.hop]
+        times = np.lib.stride_tricks.sliding_window_view(
+            t[first:stop], self.segment_len
+        )[::self.hop]
+        nonuniform = _nonuniform_rows(times)
+        if np.any(nonuniform):
+            segments = segments.copy()
+            for row in np.flatnonzero(nonuniform):
+                _, segments[row] = resample_uniform(
+                    times[row], segments[row], n=self.segment_len, 
+                    method='linear'
+                )
+        power = _segment_power(segments, self._window)
+        dt = (times[:,-1] - times[:,0]) / (self.segment_len-1)
+
+        idx = (self._count + n_skip + np.arange(n_calc)) % self.n_average
+        self._power[idx] = power
+        self._dt[idx] = dt
+        self._t0[idx] = times[:,0]
+        self._count += n_new
+        self._next += n_new*self.hop
+        return n_new
+
+    def get_spectrum(self):
+        """updates the estimator and returns frequency and amplitude arrays
+
+        If the buffer does not contain a complete segment yet, the spectrum
+        of all present values is returned.
+        """
+        self.update()
+        n = min(self._count, self.n_average)
+        if n == 0:
+            t, y = resample_uniform(*self.buffer.get_data())
+            return welch(t, y, len(t), window=self.window)
+        dt = self._dt[:n].mean()
+        freq = np.fft.rfftfreq(self.segment_len, dt)
+        return freq, np.sqrt(self._power[:n].mean(axis=0))
+
+
+class Spectrogram(WelchSpectrum):
+    """Short-time Fourier transform of the values in a DataBuffer
+
+    The power spectra of the n_columns most recent segments are kept in the
+    segment ring buffer of WelchSpectrum. They form the columns of an image
+    with fixed size, i.e. memory and cost per image update do not depend on
+    the length of the data line. New columns are computed incrementally when
+    the image is requested.
+
+
+    Parameter
+    ---------
+    buffer : DataBuffer
+        buffer containing the data line values
+    segment_len : int
+        number of values per column
+    overlap : float
+        fraction by which consecutive segments overlap
+    window : str
+        window function applied to every segment. See WINDOWS.
+    n_columns : int
+        number of columns of the image
+
+    """
+
+    OVERLAP = 0.
+    N_COLUMNS = 512
+
+    def __init__(self, buffer, segment_len=None, overlap=None, window=None,
+                 n_columns=None):
+        super().__init__(
+            buffer,
+            segment_len=segment_len,
+            overlap=Spectrogram.OVERLAP if overlap is None else overlap,
+            window=window,
+            n_average=n_columns or Spectrogram.N_COLUMNS
+        )
+
+    @property
+    def n_columns(self):
+        return self.n_average
+
+    def get_image(self):
+        """updates the spectrogram and returns its image
+
+        Return
+        ------
+        tuple
+            (image, tmin, tmax, fmax) with image of shape (columns, 
+            frequencies) containing the amplitudes in dB in chronological 
+            column order, the time range covered by the columns, and the 
+            maximum frequency. None if no segment is complete yet.
+
+        """
+        self.update()
+        n = min(self._count, self.n_average)
+        if n == 0:
+            return None
+        idx = (self._count - n + np.arange(n)) % self.n_average
+        image = 10*np.log10(self._power[idx] + np.finfo(np.float64).tiny)
+        dt = self._dt[idx].mean()
+        tmin = self._t0[idx[0]]
+        tmax = self._t0[idx[-1]] + self.hop*dt
+        return image, tmin, tmax, 0.5/dt
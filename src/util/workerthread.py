@@ -20,6 +20,7 @@ Example:
 
 import threading
 import queue
+import heapq
 import csv
 import time
 import inspect
@@ -43,8 +44,28 @@ class WorkerTaskException(Exception):
 # ===========================================================================        
 
 class WorkerThread(threading.Thread):
-    """creates a thread to 
+    """creates a thread to process WorkerTask objects from a queue
 
+    The thread blocks on the queue while no task is queued, i.e. an idle 
+    thread does not use CPU time and a queued task is started as soon as it
+    arrives. ``stop()`` puts a sentinel in the queue which wakes the thread
+    up and ends it.
+
+    Tasks with a period are scheduled against absolute deadlines on the 
+    monotonic clock which are kept in a heap. The deadline of the next run is
+    the deadline of the previous run plus the period, i.e. the run times do 
+    not drift by the execution time of the task. Deadlines which passed 
+    before the task could run again are skipped and counted in the 
+    late_runs attribute of the task instead of running the task back-to-back.
+
+    Tasks which are still queued when the thread ends (e.g. tasks put after
+    ``stop()``) are not run. Their ``cancel()`` method is called instead, 
+    also for tasks put after the thread ended.
+
+    Continuous and periodic tasks can be paused with ``pause_task()``. A 
+    paused task is removed from the queue or the schedule until 
+    ``resume_task()`` is called. Periodic tasks are scheduled from the time 
+    of resuming, i.e. deadlines during the pause are not counted as late.
 
 
     Example:
@@ -59,40 +80,136 @@ class WorkerThread(threading.Thread):
 
      """
 
-    SLEEP_TIME = 0.001
+    TIMEOUT = 1.                # s after which the stop flag is checked
+    _STOP = object()            # sentinel which ends the thread
 
-    def __init__(self, q=None, sleep_time=None):
+    def __init__(self, q=None, timeout=None):
         super(WorkerThread, self).__init__()
         if q is None: 
             q=queue.Queue()
         self.q = q
         self._stop_thread = True
-        if sleep_time is None:
-            self.sleep_time = WorkerThread.SLEEP_TIME
+        if timeout is None:
+            self.timeout = WorkerThread.TIMEOUT
         else:
-            self.sleep_time = sleep_time
+            self.timeout = timeout
+        self._schedule = []     # heap of (deadline, count, task)
+        self._count = 0         # keeps order of tasks with same deadline
+        self._paused = set()    # paused tasks removed from queue or schedule
+        self._put_lock = threading.Lock()
+        self._finished = False  # thread ended, queued tasks are cancelled
 
     def run(self):
 
         self._stop_thread = False
         while not self._stop_thread:
-            if not self.q.empty():    
-                self.process_task()
-            time.sleep(self.sleep_time)
+            try:
+                task = self.q.get(timeout=self._get_wait_time())
+            except queue.Empty:
+                task = None
+            if task is WorkerThread._STOP:
+                break
+            if task is not None:
+                self.process_task(task)
+            self._run_scheduled_tasks()
+        self._cancel_queued_tasks()
+
+    def _cancel_queued_tasks(self):
+        """cancels tasks which are left in the queue. Runs in the thread 
+        when it ends."""
+        with self._put_lock:
+            self._finished = True
+            with self.q.mutex:
+                tasks = list(self.q.queue)
+        for task in tasks:
+            if task is not WorkerThread._STOP:
+                task.cancel()
+
+    def _get_wait_time(self):
+        """returns time until next deadline, limited to timeout"""
+        if not self._schedule:
+            return self.timeout
+        dt = self._schedule[0][0] - time.monotonic()
+        return min(self.timeout, max(0., dt))
+
+    def _schedule_task(self, task, deadline):
+        heapq.heappush(self._schedule, (deadline, self._count, task))
+        self._count += 1
+
+    def _run_scheduled_tasks(self):
+        """runs all periodic tasks whose deadline passed"""
+        while self._schedule and not self._stop_thread:
+            deadline, _, task = self._schedule[0]
+            now = time.monotonic()
+            if deadline > now:
+                return
+            heapq.heappop(self._schedule)
+            task.do_task()
+            deadline += task.period
+            now = time.monotonic()
+            if deadline <= now:
+                n_late = int((now - deadline) // task.period) + 1
+                task.late_runs += n_late
+                deadline += n_late * task.period
+            self._schedule_task(task, deadline)
 
     def stop(self):
         self._stop_thread = True
+        if self.is_alive():
+            # wakes up thread waiting for a task
+            self.q.put(WorkerThread._STOP)
+
+    def pause_task(self, task):
+        """stops running task until resume_task() is called"""
+        self.put(WorkerTaskBase(func=self._pause_task, args=(task,)))
+
+    def resume_task(self, task):
+        """runs paused task again. Periodic tasks are scheduled from now 
+        on."""
+        self.put(WorkerTaskBase(func=self._resume_task, args=(task,)))
+
+    def _pause_task(self, task):
+        """removes task from schedule. Runs in the thread."""
+        task.paused = True
+        n = len(self._schedule)
+        self._schedule = [
+            entry for entry in self._schedule if entry[2] is not task
+        ]
+        if len(self._schedule) != n:
+            heapq.heapify(self._schedule)
+            self._paused.add(task)
+
+    def _resume_task(self, task):
+        """puts paused task back in the queue. Runs in the thread."""
+        task.paused = False
+        if task in self._paused:
+            # task is not in the queue anymore
+            self._paused.remove(task)
+            self.q.put(task)
 
     def put(self, w):
         if not isinstance(w, WorkerTaskBase):
             raise WorkerThreadException('argument needs to be WorkerTask object: {}'.format(w))
-        else:
-            self.q.put(w)
-
-
-    def process_task(self):
-        """removes task from queue and processes it"""
-        task = self.q.get()
+        # the lock is not held while putting, since a full queue blocks
+        self.q.put(w)
+        with self._put_lock:
+            finished = self._finished
+        if finished:
+            # thread does not run the task anymore
+            w.cancel()
+
+
+    def process_task(self, task=None):
+        """processes task. If no task is given, it is removed from queue.
+        Periodic tasks are scheduled to run immediately."""
+        if task is None:
+            task = self.q.get()
+        if task.paused:
+            self._paused.add(task)
+            return
+        if task.period is not None:
+            self._schedule_task(task, time.monotonic())
+            return
         if task.continuous: self.q.put(task)
         task.do_task()
 
@@ -112,7 +229,11 @@ class WorkerTaskBase(object):
     >>>     print('hello')
     >>>
     >>> wt = WorkerTaskBase(func, continuous=True)
+    >>> wt = WorkerTaskBase(func, period=0.01)   # runs every 10 ms
     
+    A task with period is repeated with the given period in seconds. Runs 
+    which could not take place in time are counted in late_runs. Paused tasks
+    (see ``WorkerThread.pause_task()``) are not run.
     
     """
     COUNT = 0
@@ -123,9 +244,13 @@ class WorkerTaskBase(object):
                  kwargs=None, 
                  continuous=False,
                  callback=None,
+                 period=None,
                  ):
         WorkerTaskBase.COUNT += 1
         self.continuous = continuous
+        self.period = self._check_period(period)
+        self.late_runs = 0
+        self.paused = False
 
         self.func = self._check_func(func)
         self.args = self._check_args(args)
@@ -140,6 +265,20 @@ class WorkerTaskBase(object):
             raise WorkerTaskException(err_msg)
         return func
     
+    def _check_period(self, period):
+        
+        err_msg = 'period needs to be a positive number: {}'.format(period)
+        
+        if period is None:
+            return period
+        try:
+            period = float(period)
+        except (TypeError, ValueError):
+            raise WorkerTaskException(err_msg)
+        if not period > 0:
+            raise WorkerTaskException(err_msg)
+        return period
+    
     def _check_callback(self, callback):
         
         err_msg = 'callback needs to be callable object: {}'.format(callback)
@@ -182,6 +321,12 @@ class WorkerTaskBase(object):
         if self.callback is not None: 
             self.callback(self.rtn)
 #        return self.rtn
+
+    def cancel(self):
+        """called instead of do_task() if the thread ended before running the
+        task. May be called twice for a task put while the thread ends. Does
+        nothing by default."""
+        pass
     
 
 # ===========================================================================
@@ -34,6 +34,7 @@ from time_plot_worker import TimePlotWorker
 
 from util.workerthread import WorkerThread,WorkerTaskBase
 from util.devicewrapper import DeviceWrapper, DummyDevice
+from util.samplequeue import SampleQueue
 
 
 # ============================================================================
@@ -124,21 +125,24 @@ class ValueLabelGui(QWidget):
     def _init_worker_thread(self, devicewrapper):
         """ """
         
-        # Setup QWaitCondition
-        self.mutex = QMutex()
-        self.cond = QWaitCondition()
+        # Setup sample queue. Only the latest value is displayed
+        self.queue = SampleQueue(overflow='drop_oldest')
         
         # Setup the measurement engine        
 #        self.mthread = QtCore.QThread()
-        self.worker = TimePlotWorker(devicewrapper, self.mutex, self.cond)        
+        self.worker = TimePlotWorker(
+            devicewrapper, self.queue, sampling_latency=0.1
+        )
         
         
         # connect signal and slots
         self.start_signal.connect(self.worker.start)
         self.stop_signal.connect(self.worker.stop)
         
-        
-        self.worker.reading.connect(self.newReading)
+        self.timer = QtCore.QTimer()
+        self.timer.setInterval(100)
+        self.timer.timeout.connect(self.newReading)
+        self.timer.start()
         
         return
 
@@ -155,14 +159,12 @@ class ValueLabelGui(QWidget):
         
 
 
-    @QtCore.pyqtSlot(float)
-    def newReading(self, val):
-        """ """
-        pg.QtGui.QApplication.processEvents()
-        
-        self.update_ValueLabel(val)
-        time.sleep(0.1)         # necessary to avoid worker to freeze
-        self.cond.wakeAll()     # wake worker thread up 
+    @QtCore.pyqtSlot()
+    def newReading(self):
+        """displays latest value queued by the worker"""
+        t, y = self.queue.drain()
+        if len(y) > 0:
+            self.update_ValueLabel(y[-1])
         return
 
 
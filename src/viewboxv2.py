@@ -11,6 +11,11 @@ import pyqtgraph as pg
 class ViewBoxV2(pg.ViewBox):
     """Alternative version of viewbox that allows autopan to work as desired 
     without directly changing the source code
+
+    Autorange and autopan use the bounds returned by ``childrenBounds()``.
+    PlotDataItemV2 answers them from running bounds and its level-of-detail
+    pyramid, such that an autorange update costs O(lines) instead of 
+    O(values).
     """
     def __init__(self, parent=None, border=None, lockAspect=False, 
                  enableMouse=True, invertY=False, enableMenu=True, name=None, 
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the per-append cost of TimePlotDataItem for growing data sizes.
+
+The data item is prefilled with n samples before the time needed for a fixed
+number of append_value calls is measured. With the DataBuffer backing store
+the cost per append stays flat from 1e3 to 1e7 samples. The np.append based
+implementation used before is measured for comparison.
+
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+test_mode = True
+if not test_mode:
+    from TimePlotGui import TimePlotDataItem
+else:
+    module_path = os.path.dirname(os.getcwd())
+    if module_path not in sys.path:
+        sys.path.append(module_path)
+    from src import TimePlotDataItem
+
+
+N_APPEND = 1000
+N_APPEND_LEGACY = 20
+SIZES = [int(1e3), int(1e4), int(1e5), int(1e6), int(1e7)]
+
+
+def time_data_item_append(n):
+    """returns mean time in s for one append_value call at n samples"""
+    data_item = TimePlotDataItem(
+        data_fn='benchmark.json',
+        absolute_time=0,
+        do_autosave=False
+    )
+    data_item.set_data(np.arange(n, dtype=float), np.random.rand(n))
+    t0 = time.perf_counter()
+    for idx in range(N_APPEND):
+        data_item.append_value(1., n+idx)
+    return (time.perf_counter() - t0) / N_APPEND
+
+
+def time_np_append(n):
+    """returns mean time in s for one np.append based append at n samples"""
+    t = np.arange(n, dtype=float)
+    y = np.random.rand(n)
+    t0 = time.perf_counter()
+    for idx in range(N_APPEND_LEGACY):
+        t = np.append(t, n+idx)
+        y = np.append(y, 1.)
+    return (time.perf_counter() - t0) / N_APPEND_LEGACY
+
+
+# ===========================================================================
+# run benchmark
+# ===========================================================================
+app = QApplication.instance()
+if app is None:
+    app = QApplication(sys.argv)
+
+print('{:>10s} {:>22s} {:>22s}'.format(
+    'samples', 'append_value [us]', 'np.append [us]'
+))
+for n in SIZES:
+    dt_buffer = time_data_item_append(n)
+    dt_legacy = time_np_append(n)
+    print('{:>10d} {:>22.2f} {:>22.2f}'.format(n, 1e6*dt_buffer, 1e6*dt_legacy))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of clipToView and autoDownsample of PlotDataItemV2 for uniform,
+jittered, and gapped time values.
+
+For every data set the view is zoomed to a fixed time window. The benchmark
+compares the number of visible values with the range kept by clipping and
+reports the time needed by getData(). The uniform-spacing estimate used
+before is evaluated for comparison: for gapped data it clips a window which
+does not match the visible values.
+
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+import pyqtgraph as pg
+
+test_mode = True
+if not test_mode:
+    from TimePlotGui import PlotDataItemV2
+else:
+    module_path = os.path.dirname(os.getcwd())
+    if module_path not in sys.path:
+        sys.path.append(module_path)
+    from src.time_plot_data_item import PlotDataItemV2
+
+
+N = int(1e6)
+N_REPEAT = 20
+VIEW_RANGE = (0.48, 0.50)       # visible range as fraction of total time
+
+
+def uniform_time(n):
+    return np.arange(n, dtype=float)
+
+def jittered_time(n):
+    return np.cumsum(0.2 + 1.6*np.random.rand(n))
+
+def gapped_time(n):
+    """acquisition paused 4 times for the duration of the whole recording"""
+    t = np.arange(n, dtype=float)
+    for idx in np.linspace(0, n, 5, endpoint=False, dtype=int)[1:]:
+        t[idx:] += n
+    return t
+
+
+def legacy_clip_indices(x, xmin, xmax):
+    """returns clip range estimated from uniform spacing"""
+    dx = float(x[-1]-x[0]) / (len(x)-1)
+    x0 = np.clip(int((xmin-x[0])/dx), 0, len(x)-1)
+    x1 = np.clip(int((xmax-x[0])/dx), 0, len(x)-1)
+    return x0, x1
+
+
+def run(name, t, plot_widget):
+    y = np.random.rand(len(t))
+    pdi = PlotDataItemV2(t, y)
+    plot_widget.addItem(pdi)
+    # set after addItem since PlotItem applies its own settings on adding
+    pdi.setClipToView(True)
+    pdi.setDownsampling(auto=True, method='peak')
+    xmin = t[0] + VIEW_RANGE[0]*(t[-1]-t[0])
+    xmax = t[0] + VIEW_RANGE[1]*(t[-1]-t[0])
+    plot_widget.setXRange(xmin, xmax, padding=0)
+    app.processEvents()
+
+    t0 = time.perf_counter()
+    for idx in range(N_REPEAT):
+        pdi.xDisp = pdi.yDisp = None
+        x_disp, _ = pdi.getData()
+    dt = (time.perf_counter() - t0) / N_REPEAT
+
+    visible = np.count_nonzero((t >= xmin) & (t <= xmax))
+    x0, x1 = legacy_clip_indices(t, xmin, xmax)
+    legacy_visible = np.count_nonzero((t[x0:x1] >= xmin) & (t[x0:x1] <= xmax))
+    print('{:>10s} {:>10d} {:>14d} {:>16d} {:>10d} {:>12.2f}'.format(
+        name, visible, x1-x0, legacy_visible, len(x_disp), 1e3*dt
+    ))
+    plot_widget.removeItem(pdi)
+
+
+# ===========================================================================
+# run benchmark
+# ===========================================================================
+app = QApplication.instance()
+if app is None:
+    app = QApplication(sys.argv)
+
+plot_widget = pg.PlotWidget()
+plot_widget.resize(800, 600)
+plot_widget.show()
+
+print('{:>10s} {:>10s} {:>14s} {:>16s} {:>10s} {:>12s}'.format(
+    'data', 'visible', 'legacy clip', 'legacy visible', 'plotted',
+    'getData [ms]'
+))
+for name, func in [('uniform', uniform_time), ('jittered', jittered_time),
+                   ('gapped', gapped_time)]:
+    run(name, func(N), plot_widget)
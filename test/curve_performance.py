@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of repainting a long scrolling data line with PlotDataItemV2.
+
+Values are appended in small batches to a data line which is repainted
+after every batch. The benchmark reports the time per repaint with all 
+values drawn and with level-of-detail plotting from a MinMaxPyramid, which
+reduces the line to min/max pairs matching the pixel width of the view. 
+With level-of-detail plotting the repaint time does not depend on the 
+length of the data line.
+
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+import pyqtgraph as pg
+
+test_mode = True
+if not test_mode:
+    from TimePlotGui import PlotDataItemV2
+else:
+    module_path = os.path.dirname(os.getcwd())
+    if module_path not in sys.path:
+        sys.path.append(module_path)
+    from src.time_plot_data_item import PlotDataItemV2
+    from src.util.databuffer import DataBuffer
+    from src.util.minmaxpyramid import MinMaxPyramid
+
+
+N_VALUES = [int(1e4), int(1e5), int(1e6)]
+N_APPEND = 10                   # values appended per repaint
+N_REPAINT = 20
+
+
+def run(plot_widget, n_values, lod):
+    buf = DataBuffer()
+    t = np.arange(n_values, dtype=float)
+    buf.extend(t, np.sin(1e-3*t) + np.random.rand(n_values))
+    pdi = PlotDataItemV2()
+    if lod:
+        pdi.set_level_of_detail(MinMaxPyramid(buf))
+    pdi.setData(*buf.get_data())
+    plot_widget.addItem(pdi)
+    plot_widget.grab()
+
+    t0 = time.perf_counter()
+    for idx in range(N_REPAINT):
+        t = n_values + idx*N_APPEND + np.arange(N_APPEND, dtype=float)
+        buf.extend(t, np.random.rand(N_APPEND))
+        pdi.setData(*buf.get_data())
+        plot_widget.grab()
+    dt = (time.perf_counter() - t0) / N_REPAINT
+
+    plot_widget.removeItem(pdi)
+    return dt
+
+
+# ===========================================================================
+# run benchmark
+# ===========================================================================
+app = QApplication.instance()
+if app is None:
+    app = QApplication(sys.argv)
+
+plot_widget = pg.PlotWidget()
+plot_widget.resize(800, 600)
+plot_widget.show()
+
+print('{:>10s} {:>18s} {:>18s}'.format(
+    'values', 'all values [ms]', 'level-of-detail [ms]'
+))
+for n_values in N_VALUES:
+    dt = [run(plot_widget, n_values, lod) for lod in [False, True]]
+    print('{:>10d} {:>18.2f} {:>18.2f}'.format(n_values, 1e3*dt[0], 1e3*dt[1]))
@@ -20,7 +20,8 @@ else:
     if module_path not in sys.path:
         sys.path.append(module_path)
     from src import TimePlotMainWindow, DeviceWrapper, DummyDevice
-    from src.plot_item_settings import PlotItemSettings, JSONFileHandler
+    from src.plot_item_settings import PlotItemSettings
+    from src.util.datastore import DataStore
 
 
 # ===========================================================================
@@ -66,12 +67,11 @@ except:
 
 
 
-json_handler = JSONFileHandler()
-data_dct = json_handler.load(window.time_plot_ui.data_fn)
+data_store = DataStore(window.time_plot_ui.data_fn)
 
 
-d0_2 = data_dct['data_0']
-d1_2 = data_dct['data_1']
+d0_2 = data_store.load('data_0')
+d1_2 = data_store.load('data_1')
 
 
 
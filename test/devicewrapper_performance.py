@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the round trip time of synchronous DeviceWrapper calls.
+
+A device function is called N_CALLS times through the DeviceWrapper and the
+time until the return value is available is measured. The implementation 
+used before (callback sets a flag which is checked every 100 ms) is measured
+for comparison. Afterwards N_CALLERS threads call the device concurrently and
+every caller checks that it received the return value of its own call.
+
+"""
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+test_mode = True
+if not test_mode:
+    from TimePlotGui import DeviceWrapper
+else:
+    module_path = os.path.dirname(os.getcwd())
+    if module_path not in sys.path:
+        sys.path.append(module_path)
+    from src.util.devicewrapper import DeviceWrapper
+    from src.util.workerthread import WorkerTaskBase
+
+
+N_CALLS = 20                    # legacy calls take 100 ms each
+N_CALLERS = 8
+N_CALLS_PER_CALLER = 500
+
+
+class Device():
+
+    def echo(self, value):
+        return value
+
+
+class LegacyDeviceWrapper(DeviceWrapper):
+    """waits for callback by polling as done before"""
+
+    def _call(self, func, *args, **kwargs):
+        self.func_name = func
+        w = WorkerTaskBase(
+            func=self.func_name,
+            args=args,
+            kwargs=kwargs,
+            callback=self._callback
+        )
+        self.wt.put(w)
+        self.wait_for_callback = True
+
+        while self.wait_for_callback:
+            time.sleep(0.1)
+        return self.rtn
+
+    def _callback(self, return_args):
+        self.rtn = return_args
+        self.wait_for_callback = False
+
+
+def run(wrapper_class, n_calls):
+    dw = wrapper_class(Device())
+    dw.start()
+    latencies = []
+    for idx in range(n_calls):
+        t0 = time.perf_counter()
+        dw.echo(idx)
+        latencies.append(time.perf_counter() - t0)
+    dw.stop()
+    dw.wt.join()
+    return np.array(latencies)
+
+
+def run_concurrent(wrapper_class):
+    """returns number of calls which returned the value of another call"""
+    dw = wrapper_class(Device())
+    dw.start()
+    errors = [0] * N_CALLERS
+
+    def caller(caller_idx):
+        for idx in range(N_CALLS_PER_CALLER):
+            value = (caller_idx, idx)
+            if dw.echo(value) != value:
+                errors[caller_idx] += 1
+
+    threads = [
+        threading.Thread(target=caller, args=(idx,)) for idx in range(N_CALLERS)
+    ]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    dw.stop()
+    dw.wt.join()
+    return sum(errors)
+
+
+# ===========================================================================
+# run benchmark
+# ===========================================================================
+print('{:>20s} {:>16s} {:>16s} {:>16s}'.format(
+    'wrapper', 'median [us]', '99% [us]', 'max [us]'
+))
+for wrapper_class, n_calls in [
+        (LegacyDeviceWrapper, N_CALLS), (DeviceWrapper, 100*N_CALLS)]:
+    latencies = run(wrapper_class, n_calls)
+    print('{:>20s} {:>16.1f} {:>16.1f} {:>16.1f}'.format(
+        wrapper_class.__name__, 1e6*np.median(latencies),
+        1e6*np.percentile(latencies, 99), 1e6*np.max(latencies)
+    ))
+
+print('\n{} threads with {} calls each: {} wrong return values'.format(
+    N_CALLERS, N_CALLS_PER_CALLER, run_concurrent(DeviceWrapper)
+))
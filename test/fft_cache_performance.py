@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the FFT result cache of PlotDataItemV2.
+
+A data line is shown in FFT mode while display updates without new data
+(resizing, zooming, toggling the log mode) alternate with appended values.
+The benchmark reports the cache hit rate and the time spent per display
+update with and without cache.
+
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+import pyqtgraph as pg
+
+test_mode = True
+if not test_mode:
+    from TimePlotGui import PlotDataItemV2
+else:
+    module_path = os.path.dirname(os.getcwd())
+    if module_path not in sys.path:
+        sys.path.append(module_path)
+    from src.time_plot_data_item import PlotDataItemV2
+
+
+N = int(1e6)
+N_CYCLES = 20
+N_UPDATES = 10                  # display updates without new data per cycle
+
+
+def run(plot_widget, cache_size):
+    t = np.cumsum(0.9 + 0.2*np.random.rand(N))
+    y = np.sin(t) + np.random.rand(N)
+    pdi = PlotDataItemV2(t, y)
+    pdi.fft_cache_size = cache_size
+    plot_widget.addItem(pdi)
+    pdi.setFftMode(True)
+    app.processEvents()
+
+    t0 = time.perf_counter()
+    for cycle in range(N_CYCLES):
+        for idx in range(N_UPDATES):
+            plot_widget.resize(800 + idx%2, 600)
+            plot_widget.setXRange(0, 0.1 + 0.01*idx)
+            pdi.setLogMode(False, idx%2 == 1)
+            app.processEvents()
+        t = np.append(t, t[-1]+1)
+        y = np.append(y, 0.)
+        pdi.setData(t, y)
+        app.processEvents()
+    dt = (time.perf_counter() - t0) / (N_CYCLES*(N_UPDATES+1))
+
+    plot_widget.removeItem(pdi)
+    return pdi.fft_cache_stats, pdi.get_fft_cache_hit_rate(), dt
+
+
+# ===========================================================================
+# run benchmark
+# ===========================================================================
+app = QApplication.instance()
+if app is None:
+    app = QApplication(sys.argv)
+
+plot_widget = pg.PlotWidget()
+plot_widget.show()
+
+print('{:>12s} {:>8s} {:>8s} {:>10s} {:>18s}'.format(
+    'cache size', 'hits', 'misses', 'hit rate', 'per update [ms]'
+))
+for cache_size in [0, PlotDataItemV2.FFT_CACHE_SIZE]:
+    stats, hit_rate, dt = run(plot_widget, cache_size)
+    print('{:>12d} {:>8d} {:>8d} {:>10.2f} {:>18.2f}'.format(
+        cache_size, stats['hits'], stats['misses'], hit_rate, 1e3*dt
+    ))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the level-of-detail plotting of PlotDataItemV2.
+
+A long data line is shown at several zoom levels. The benchmark reports the
+number of plotted values and the time needed by getData() with values 
+reduced by the MinMaxPyramid and with clipToView and 'peak' downsampling of
+pyqtgraph for comparison.
+
+Afterwards short and long data lines are zoomed and panned while values are
+appended. After every step it is checked that the plotted data equal the
+data fetched for the visible range, i.e. that no data fetched for a previous
+view range are shown.
+
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+import pyqtgraph as pg
+
+test_mode = True
+if not test_mode:
+    from TimePlotGui import PlotDataItemV2
+else:
+    module_path = os.path.dirname(os.getcwd())
+    if module_path not in sys.path:
+        sys.path.append(module_path)
+    from src.time_plot_data_item import PlotDataItemV2
+    from src.util.databuffer import DataBuffer
+    from src.util.minmaxpyramid import MinMaxPyramid
+
+
+N = int(1e6)
+N_REPEAT = 20
+ZOOM = [1., 1e-1, 1e-2, 1e-3]   # visible fraction of the data line
+N_SHORT = 200
+
+
+def create_item(plot_widget, n, lod=True):
+    buf = DataBuffer()
+    t = np.arange(n, dtype=float)
+    buf.extend(t, np.sin(1e-2*t) + np.random.rand(n))
+    pdi = PlotDataItemV2()
+    if lod:
+        pdi.set_level_of_detail(MinMaxPyramid(buf))
+    pdi.setData(*buf.get_data())
+    plot_widget.addItem(pdi)
+    # set after addItem since PlotItem applies its own settings on adding
+    if not lod:
+        pdi.setClipToView(True)
+        pdi.setDownsampling(auto=True, method='peak')
+    return buf, pdi
+
+
+def set_view(plot_widget, xmin, xmax):
+    plot_widget.setXRange(xmin, xmax, padding=0)
+    app.processEvents()
+
+
+def run_zoom(plot_widget, lod):
+    buf, pdi = create_item(plot_widget, N, lod)
+    results = []
+    for zoom in ZOOM:
+        set_view(plot_widget, 0.5*N*(1-zoom), 0.5*N*(1+zoom))
+        t0 = time.perf_counter()
+        for idx in range(N_REPEAT):
+            pdi.xDisp = pdi.yDisp = None
+            x_disp, _ = pdi.getData()
+        dt = (time.perf_counter() - t0) / N_REPEAT
+        results.append((zoom, len(x_disp), dt))
+    plot_widget.removeItem(pdi)
+    return results
+
+
+def is_up_to_date(pdi):
+    """checks that plotted data equal the data fetched for the current 
+    view range"""
+    x_disp, y_disp = pdi.getData()
+    pdi.xDisp = pdi.yDisp = None
+    x_new, y_new = pdi.getData()
+    return np.array_equal(x_disp, x_new) and np.array_equal(y_disp, y_new)
+
+
+def run_pan_zoom(plot_widget, n):
+    buf, pdi = create_item(plot_widget, n)
+    plot_widget.getViewBox().disableAutoRange()
+    steps = [
+        ('zoom in', lambda: set_view(plot_widget, 0.5*n, 0.5*n + 0.01*n)),
+        ('append', lambda: (
+            buf.append(n, 0.), pdi.setData(*buf.get_data()),
+            app.processEvents()
+        )),
+        ('zoom out', lambda: set_view(plot_widget, 0, n)),
+        ('pan left', lambda: set_view(plot_widget, -0.5*n, 0.5*n)),
+        ('pan right', lambda: set_view(plot_widget, 0.5*n, 1.5*n)),
+    ]
+    results = []
+    for name, step in steps:
+        step()
+        results.append((name, is_up_to_date(pdi)))
+    plot_widget.removeItem(pdi)
+    plot_widget.getViewBox().enableAutoRange()
+    return results
+
+
+# ===========================================================================
+# run benchmark
+# ===========================================================================
+app = QApplication.instance()
+if app is None:
+    app = QApplication(sys.argv)
+
+plot_widget = pg.PlotWidget()
+plot_widget.resize(800, 600)
+plot_widget.show()
+
+print('{:>10s} {:>10s} {:>12s} {:>14s}'.format(
+    'mode', 'zoom', 'plotted', 'getData [ms]'
+))
+for mode, lod in [('peak', False), ('pyramid', True)]:
+    for zoom, n_plotted, dt in run_zoom(plot_widget, lod):
+        print('{:>10s} {:>10g} {:>12d} {:>14.2f}'.format(
+            mode, zoom, n_plotted, 1e3*dt
+        ))
+
+print('\n{:>10s} {:>10s} {:>14s}'.format('values', 'step', 'up to date'))
+for n in [N_SHORT, N]:
+    for name, up_to_date in run_pan_zoom(plot_widget, n):
+        print('{:>10d} {:>10s} {:>14s}'.format(n, name, str(up_to_date)))
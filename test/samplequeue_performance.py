@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Threaded stress test and throughput of SampleQueue.
+
+A producer thread puts N_SAMPLES samples with increasing time stamps into a
+small queue while the consumer drains it at random intervals, such that the
+ring buffer runs full repeatedly. This is done for every overflow policy.
+The drained samples must be in order (increasing time stamps), must not be
+torn (the value of every sample is the negative time stamp), and every
+sample which was put must either be drained or be counted as dropped.
+
+"""
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+test_mode = True
+if not test_mode:
+    from TimePlotGui import SampleQueue, OVERFLOW_POLICIES
+else:
+    module_path = os.path.dirname(os.getcwd())
+    if module_path not in sys.path:
+        sys.path.append(module_path)
+    from src.util.samplequeue import SampleQueue, OVERFLOW_POLICIES
+
+
+N_SAMPLES = 500000
+CAPACITY = 256
+MAX_DRAIN_INTERVAL = 0.002      # s
+SWITCH_INTERVAL = 1e-5          # s, provokes frequent thread switches
+
+
+class SlowCopySampleQueue(SampleQueue):
+    """releases the GIL while the consumer copies samples from the ring 
+    buffer such that the producer runs in between"""
+
+    def _copy_range(self, start, stop):
+        time.sleep(0)
+        return super()._copy_range(start, stop)
+
+
+def run(overflow):
+    q = SlowCopySampleQueue(capacity=CAPACITY, overflow=overflow)
+
+    def produce():
+        for idx in range(N_SAMPLES):
+            q.put(float(idx), float(-idx))
+
+    producer = threading.Thread(target=produce)
+    rng = np.random.default_rng(0)
+    blocks = []
+    t0 = time.perf_counter()
+    producer.start()
+    while producer.is_alive():
+        blocks.append(q.drain())
+        time.sleep(MAX_DRAIN_INTERVAL * rng.random())
+    producer.join()
+    blocks.append(q.drain())
+    dt = time.perf_counter() - t0
+
+    t = np.concatenate([block[0] for block in blocks])
+    y = np.concatenate([block[1] for block in blocks])
+    metrics = q.get_metrics()
+    ordered = bool(np.all(np.diff(t) > 0))
+    not_torn = bool(np.array_equal(y, -t))
+    counted = metrics['put'] == metrics['drained'] + metrics['dropped'] \
+        and metrics['drained'] == len(t) and metrics['put'] == N_SAMPLES
+    return N_SAMPLES / dt, metrics, ordered and not_torn and counted
+
+
+# ===========================================================================
+# run test
+# ===========================================================================
+sys.setswitchinterval(SWITCH_INTERVAL)
+print('{:>12s} {:>14s} {:>10s} {:>10s} {:>10s} {:>8s}'.format(
+    'overflow', 'samples/s', 'dropped', 'spilled', 'blocked', 'valid'
+))
+all_valid = True
+for overflow in OVERFLOW_POLICIES:
+    rate, metrics, valid = run(overflow)
+    all_valid &= valid
+    print('{:>12s} {:>14.0f} {:>10d} {:>10d} {:>10d} {:>8s}'.format(
+        overflow, rate, metrics['dropped'], metrics['spilled'],
+        metrics['blocked'], str(valid)
+    ))
+assert all_valid, 'samples are out of order, torn, or not counted'
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark of task dispatch latency and idle CPU use of WorkerThread.
+
+32 worker threads are started. The idle CPU time of the process is measured
+while no task is queued. Afterwards tasks are put into the queues one at a
+time and the time from put() until the task starts is measured. The polling
+implementation used before (check queue, sleep 1 ms) is measured for
+comparison.
+
+"""
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+test_mode = True
+if not test_mode:
+    from TimePlotGui import WorkerThread, WorkerTaskBase
+else:
+    module_path = os.path.dirname(os.getcwd())
+    if module_path not in sys.path:
+        sys.path.append(module_path)
+    from src.util.workerthread import WorkerThread, WorkerTaskBase
+
+
+N_THREADS = 32
+N_TASKS = 50                    # tasks per thread
+IDLE_TIME = 2.                  # s
+
+
+class LegacyWorkerThread(WorkerThread):
+    """polls queue every SLEEP_TIME seconds as done before"""
+
+    SLEEP_TIME = 0.001
+
+    def run(self):
+        self._stop_thread = False
+        while not self._stop_thread:
+            if not self.q.empty():
+                self.process_task()
+            time.sleep(LegacyWorkerThread.SLEEP_TIME)
+
+    def stop(self):
+        self._stop_thread = True
+
+
+def run(thread_class):
+    threads = [thread_class(queue.Queue()) for idx in range(N_THREADS)]
+    for wt in threads:
+        wt.start()
+
+    # idle CPU use
+    cpu0 = time.process_time()
+    time.sleep(IDLE_TIME)
+    idle_cpu = (time.process_time() - cpu0) / IDLE_TIME
+
+    # dispatch latency
+    latencies = []
+    for idx in range(N_TASKS):
+        for wt in threads:
+            done = threading.Event()
+            t_start = []
+            wt.put(WorkerTaskBase(
+                func=lambda: t_start.append(time.perf_counter()),
+                callback=lambda rtn: done.set()
+            ))
+            t_put = time.perf_counter()
+            done.wait()
+            latencies.append(t_start[0] - t_put)
+
+    for wt in threads:
+        wt.stop()
+    for wt in threads:
+        wt.join()
+    return idle_cpu, np.array(latencies)
+
+
+# ===========================================================================
+# run benchmark
+# ===========================================================================
+print('{:>16s} {:>16s} {:>16s} {:>16s}'.format(
+    'thread', 'idle CPU [%]', 'median [us]', '99% [us]'
+))
+for thread_class in [LegacyWorkerThread, WorkerThread]:
+    idle_cpu, latencies = run(thread_class)
+    print('{:>16s} {:>16.1f} {:>16.1f} {:>16.1f}'.format(
+        thread_class.__name__, 100*idle_cpu,
+        1e6*np.median(latencies), 1e6*np.percentile(latencies, 99)
+    ))